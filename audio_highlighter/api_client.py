@@ -1,10 +1,138 @@
-import requests
+import atexit
+import functools
+import hashlib
+import itertools
 import json
+import requests
 import logging
-from typing import Optional, List
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Import configuration constants
-from .config import OPENROUTER_API_URL, YOUR_SITE_URL, YOUR_SITE_NAME
+from .config import (
+    OPENROUTER_API_URL, OPENROUTER_MODELS_URL, REQUEST_TIMEOUT, YOUR_SITE_URL, YOUR_SITE_NAME,
+    LLM_CACHE_DIR, LLM_CACHE_TTL, LLM_CACHE_VERSION, MODELS_CACHE_TTL, LLM_MAX_WORKERS, LLM_REQUESTS_PER_MINUTE,
+    LLM_CHUNK_TOKENS, LLM_CHUNK_OVERLAP_TOKENS, LLM_OUTPUT_FORMAT, LLM_PROMPT_FILES
+)
+from .cache import DiskCache
+
+# orjson is an optional speed-up for parsing the (large) model catalog and stream events,
+# and for serializing request bodies that carry a whole transcript.
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    _json_dumps = None
+    _json_loads = json.loads
+
+FREE_MODELS_CACHE_KEY = "free_models_v1"
+# OpenRouter reports prices as decimal strings; free models almost always use one of these spellings.
+_ZERO_PRICES = frozenset({"0", "0.0", 0, 0.0, "0.00000000", "0E-8"})
+PROMPT_PLACEHOLDER = "{full_transcript}"
+CHARS_PER_TOKEN = 4  # rough estimate, good enough for sizing transcript chunks
+# Sampling settings sent with every highlights request; they are part of the response cache key.
+GENERATION_PARAMS = {"max_tokens": 2048, "temperature": 0.4}
+
+# Shared by all clients so concurrent LLM requests (e.g. comparing models) reuse pooled sessions.
+_executor = ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS, thread_name_prefix="openrouter")
+# Chunk requests get their own pool so a job on `_executor` can wait for its chunks without deadlocking.
+_map_executor = ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS, thread_name_prefix="openrouter-map")
+# Workers of both pools share these slots, so at most LLM_MAX_WORKERS completions are in flight at once
+# and a long transcript's chunks cannot push the account over OpenRouter's rate limit on their own.
+_request_slots = threading.BoundedSemaphore(LLM_MAX_WORKERS)
+_shared_clients: Dict[str, "OpenRouterClient"] = {}
+_shared_clients_lock = threading.Lock()
+
+class _RateLimiter:
+    """A thread-safe token bucket: up to `burst` requests at once, refilled at `per_minute` requests per minute."""
+    def __init__(self, per_minute: float, burst: int):
+        self.interval = 60.0 / per_minute
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Takes a token, sleeping until it is available; callers that come later queue up behind it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens * self.interval if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+# Spaces out completions so a long transcript's chunks are not rejected with 429s (and retried) in a burst.
+_rate_limiter = _RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_MAX_WORKERS) if LLM_REQUESTS_PER_MINUTE > 0 else None
+
+def _iter_transcript_chunks(lines: Iterable[str], max_chars: int, overlap_chars: int) -> Iterator[str]:
+    """Groups transcript lines into chunks of at most ~max_chars characters, yielding each once it is complete."""
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        if current and size + len(line) > max_chars:
+            yield "".join(current)
+            # Carry the tail of the previous chunk over so moments spanning the boundary stay intact.
+            overlap: List[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                if overlap_size + len(previous) > overlap_chars:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += len(previous)
+            current, size = overlap, overlap_size
+        current.append(line)
+        size += len(line)
+    if current:
+        yield "".join(current)
+
+def _split_transcript(transcript: str, max_chars: int, overlap_chars: int) -> List[str]:
+    """Splits a transcript on line boundaries into chunks of at most ~max_chars characters."""
+    return list(_iter_transcript_chunks(transcript.splitlines(keepends=True), max_chars, overlap_chars))
+
+def _is_zero_price(price) -> bool:
+    """Returns True if an OpenRouter price value represents zero."""
+    if isinstance(price, (str, int, float)) and price in _ZERO_PRICES:
+        return True
+    # Only strings whose mantissa is made of zeros, dots and signs can still be zero,
+    # so float() is attempted on those alone instead of on every priced model.
+    if isinstance(price, str) and "0" in price and not price.lower().partition("e")[0].strip("+-0."):
+        try:
+            return float(price) == 0.0
+        except ValueError:
+            return False
+    return False
+
+@functools.lru_cache(maxsize=2)
+def _load_prompt_template(filename: str) -> Optional[str]:
+    """Loads the LLM prompt from an external file, once per process."""
+    try:
+        template = Path(filename).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        logging.error(f"CRITICAL: '{filename}' not found in the application's root directory.")
+        return None
+    if PROMPT_PLACEHOLDER not in template:
+        logging.error(f"CRITICAL: '{filename}' does not contain the {PROMPT_PLACEHOLDER} placeholder.")
+        return None
+    return template
+
+@functools.lru_cache(maxsize=1)
+def _prune_llm_cache_once() -> Future:
+    """Evicts expired LLM cache entries in the background, once per process."""
+    # Otherwise entries are only removed when the same transcript is looked up again after expiry.
+    return _executor.submit(DiskCache(LLM_CACHE_DIR).prune)
+
+def _join_chunk_responses(responses: List[Optional[str]]) -> Optional[str]:
+    """Concatenates the per-chunk responses, each with its own Interesting_Moments block."""
+    successful = [response for response in responses if response]
+    if len(successful) < len(responses):
+        logging.warning(f"{len(responses) - len(successful)} of {len(responses)} transcript chunks returned no highlights.")
+    return "\n\n".join(successful) if successful else None
 
 class OpenRouterClient:
     """A client for interacting with the OpenRouter AI API."""
@@ -14,45 +142,60 @@ class OpenRouterClient:
         self.api_key = api_key
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
             "HTTP-Referer": YOUR_SITE_URL,
             "X-Title": YOUR_SITE_NAME,
         }
-        self.prompt_template = self._load_prompt_template()
+        # A persistent session keeps the TLS connection to OpenRouter alive between calls.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"}),
+        )
+        # Every worker of both executors may hold a connection at once; a smaller pool would make
+        # urllib3 discard connections under parallel load and pay the TLS handshake again.
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2 * LLM_MAX_WORKERS, max_retries=retries))
+        self.output_format = LLM_OUTPUT_FORMAT if LLM_OUTPUT_FORMAT in LLM_PROMPT_FILES else "markdown"
+        self.prompt_template = _load_prompt_template(LLM_PROMPT_FILES[self.output_format])
+        # Split around the placeholder once so building a prompt is a single concatenation.
+        # Doubled braces are unescaped to match what str.format used to produce.
+        self._prompt_prefix, self._prompt_suffix = (
+            (part.replace("{{", "{").replace("}}", "}") for part in self.prompt_template.split(PROMPT_PLACEHOLDER, 1))
+            if self.prompt_template else ("", "")
+        )
+        self.cache = DiskCache(LLM_CACHE_DIR)
+        _prune_llm_cache_once()
 
-    def _load_prompt_template(self) -> Optional[str]:
-        """Loads the LLM prompt from an external file."""
-        try:
-            with open("prompt.txt", "r", encoding="utf-8") as f:
-                return f.read()
-        except FileNotFoundError:
-            logging.error("CRITICAL: 'prompt.txt' not found in the application's root directory.")
-            return None
-
-    def get_free_models(self) -> List[str]:
+    def get_free_models(self, use_cache: bool = True) -> List[str]:
         """
         Fetches the list of all models from OpenRouter and filters for free ones.
         A model is considered free if its prompt and completion pricing is 0.
+        The result is cached on disk for MODELS_CACHE_TTL seconds.
         """
+        if use_cache:
+            cached = self.cache.get(FREE_MODELS_CACHE_KEY)
+            if cached is not None:
+                logging.info(f"Using {len(cached)} cached free models.")
+                return cached
+
         logging.info("Fetching available LLM models from OpenRouter...")
         try:
-            response = requests.get(url="https://openrouter.ai/api/v1/models", headers={"Authorization": f"Bearer {self.api_key}"})
+            response = self.session.get(OPENROUTER_MODELS_URL, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            models_data = response.json().get("data", [])
-            
-            free_models = []
-            for model in models_data:
-                pricing = model.get("pricing", {})
-                try:
-                    # Check if prompt and completion prices are zero
-                    prompt_price = float(pricing.get("prompt", "1.0"))
-                    completion_price = float(pricing.get("completion", "1.0"))
-                    if prompt_price == 0.0 and completion_price == 0.0:
-                        free_models.append(model.get("id"))
-                except (ValueError, TypeError):
-                    continue  # Skip if pricing is not a valid number
+            models_data = _json_loads(response.content).get("data", [])
+
+            free_models = [
+                model["id"] for model in models_data
+                if (pricing := model.get("pricing"))
+                and _is_zero_price(pricing.get("prompt"))
+                and _is_zero_price(pricing.get("completion"))
+            ]
 
             logging.info(f"Found {len(free_models)} free models.")
+            if free_models:
+                self.cache.set(FREE_MODELS_CACHE_KEY, free_models, expire=MODELS_CACHE_TTL)
             return free_models
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to fetch models from OpenRouter API: {e}")
@@ -61,32 +204,179 @@ class OpenRouterClient:
             logging.error(f"Could not parse models from OpenRouter response: {e}")
             return []
 
-    def get_highlights_from_transcript(self, full_transcript: str, llm_model: str) -> Optional[str]:
-        """Sends the transcript to the LLM to get structured highlights."""
+    def get_highlights_from_transcript(self, full_transcript: str, llm_model: str, use_cache: bool = True,
+                                       on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Sends the transcript to the LLM to get structured highlights.
+        The response is streamed; `on_token` is called with each text chunk as it arrives.
+        Responses are cached on disk per (cache version, model, sampling settings, prompt,
+        transcript); pass use_cache=False to force a fresh request.
+
+        Transcripts longer than LLM_CHUNK_TOKENS are split into overlapping chunks that
+        are analyzed in parallel; the returned text is then the concatenation of the
+        per-chunk responses, each with its own Interesting_Moments block.
+        """
         if not self.prompt_template:
             logging.error("Cannot get highlights because the prompt template failed to load.")
             return None
 
+        if len(full_transcript) > LLM_CHUNK_TOKENS * CHARS_PER_TOKEN:
+            return self._get_highlights_chunked(full_transcript, llm_model, use_cache)
+        return self._request_highlights(full_transcript, llm_model, use_cache, on_token)
+
+    def _get_highlights_chunked(self, full_transcript: str, llm_model: str, use_cache: bool) -> Optional[str]:
+        """Map step of the long-transcript path: one request per chunk, run concurrently."""
+        chunks = _split_transcript(full_transcript, LLM_CHUNK_TOKENS * CHARS_PER_TOKEN, LLM_CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN)
+        logging.info(f"Transcript is long; analyzing it in {len(chunks)} chunks.")
+        # Streaming tokens from parallel chunks would interleave, so on_token is not forwarded.
+        futures = [_map_executor.submit(self._request_highlights, chunk, llm_model, use_cache, None) for chunk in chunks]
+        return _join_chunk_responses([future.result() for future in futures])
+
+    def get_highlights_from_lines(self, lines: Iterable[str], llm_model: str, use_cache: bool = True) -> Optional[str]:
+        """
+        Like get_highlights_from_transcript, but reads the transcript from an iterable of lines, e.g. one
+        fed while the audio is still being transcribed. On long transcripts each chunk is sent as soon as
+        it is complete, so most requests run while Whisper is still decoding; a transcript that fits in one
+        chunk gets the single request get_highlights_from_transcript would send.
+        """
+        if not self.prompt_template:
+            logging.error("Cannot get highlights because the prompt template failed to load.")
+            return None
+
+        chunks = _iter_transcript_chunks(lines, LLM_CHUNK_TOKENS * CHARS_PER_TOKEN, LLM_CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN)
+        first = next(chunks, None)
+        if first is None:
+            return None
+        second = next(chunks, None)
+        if second is None:
+            return self._request_highlights(first, llm_model, use_cache, None)
+        logging.info("Transcript is long; analyzing it in chunks as it is transcribed.")
+        futures = [
+            _map_executor.submit(self._request_highlights, chunk, llm_model, use_cache, None)
+            for chunk in itertools.chain((first, second), chunks)
+        ]
+        return _join_chunk_responses([future.result() for future in futures])
+
+    def _request_highlights(self, full_transcript: str, llm_model: str, use_cache: bool,
+                            on_token: Optional[Callable[[str], None]]) -> Optional[str]:
+        """Performs a single (cached) highlights request for the given transcript text."""
+        # Whitespace is normalized for the key only, so re-runs that differ just in spacing or line breaks still hit.
+        normalized_transcript = " ".join(full_transcript.split())
+        cache_key = hashlib.sha256(
+            f"v{LLM_CACHE_VERSION}\0{llm_model}\0{json.dumps(GENERATION_PARAMS, sort_keys=True)}\0"
+            f"{self.prompt_template}\0{normalized_transcript}".encode("utf-8")
+        ).hexdigest()
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logging.info("LLM response cache hit. Skipping API request.")
+                return cached
+
         logging.info(f"Requesting highlights from LLM using model: {llm_model}...")
         
-        prompt = self.prompt_template.format(full_transcript=full_transcript)
+        # The instructions before the transcript are identical for every request, so they go in their own
+        # content part marked for provider-side prompt caching (honoured by e.g. Anthropic and Gemini models).
+        message_content = [
+            {"type": "text", "text": self._prompt_prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": full_transcript + self._prompt_suffix},
+        ]
         
         data = {
             "model": llm_model,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 2048,
-            "temperature": 0.4
+            "messages": [{"role": "user", "content": message_content}],
+            **GENERATION_PARAMS,
+            "stream": True
         }
+        if self.output_format == "json":
+            data["response_format"] = {"type": "json_object"}
 
+        if _rate_limiter:
+            _rate_limiter.acquire()
         try:
-            response = requests.post(url=OPENROUTER_API_URL, headers=self.headers, data=json.dumps(data))
-            response.raise_for_status()
-            response_data = response.json()
+            if _json_dumps:
+                body = {"data": _json_dumps(data), "headers": {"Content-Type": "application/json"}}
+            else:
+                body = {"json": data}
+            with _request_slots, self.session.post(OPENROUTER_API_URL, timeout=REQUEST_TIMEOUT, stream=True, **body) as response:
+                response.raise_for_status()
+                content = self._read_stream(response, on_token)
+            if content is None:
+                return None
             logging.info("LLM response received successfully.")
-            return response_data['choices'][0]['message']['content'].strip()
+            if content:
+                self.cache.set(cache_key, content, expire=LLM_CACHE_TTL)
+            return content
         except requests.exceptions.RequestException as e:
             logging.error(f"API request failed: {e}")
-        except (KeyError, IndexError, ValueError) as e:
-            logging.error(f"Could not parse highlights from LLM response: {e}")
         
-        return None
\ No newline at end of file
+        return None
+
+    def get_highlights_async(self, full_transcript: str, llm_model: str, **kwargs) -> Future:
+        """
+        Runs get_highlights_from_transcript on a background worker and returns its Future.
+        Callbacks attached to the Future run on the worker thread, so GUI code must
+        hand the result back to the Tk thread (e.g. with `after`).
+        """
+        return _executor.submit(self.get_highlights_from_transcript, full_transcript, llm_model, **kwargs)
+
+    def get_highlights_from_lines_async(self, lines: Iterable[str], llm_model: str, **kwargs) -> Future:
+        """Runs get_highlights_from_lines on a background worker and returns its Future."""
+        return _executor.submit(self.get_highlights_from_lines, lines, llm_model, **kwargs)
+
+    def _read_stream(self, response: requests.Response, on_token: Optional[Callable[[str], None]]) -> Optional[str]:
+        """Collects the text deltas of a server-sent-events completion stream."""
+        # SSE responses usually omit the charset, which would make requests fall back to latin-1.
+        response.encoding = "utf-8"
+        chunks = []
+        for line in response.iter_lines(decode_unicode=True):
+            # Lines starting with ':' are keep-alive comments; blank lines separate events.
+            if not line or not line.startswith("data: "):
+                continue
+            payload = line[len("data: "):]
+            if payload == "[DONE]":
+                break
+            try:
+                event = _json_loads(payload)
+            except ValueError as e:  # json and orjson decode errors are both ValueErrors
+                logging.error(f"Could not parse highlights from LLM response: {e}")
+                return None
+            if not isinstance(event, dict):
+                continue
+            if "error" in event:
+                logging.error(f"LLM stream returned an error: {event['error']}")
+                return None
+            # Not every event carries text: the final usage chunk, for one, has an empty choices list.
+            choices = event.get("choices")
+            delta = choices[0].get("delta") if choices and isinstance(choices[0], dict) else None
+            if not isinstance(delta, dict):
+                continue
+            delta = delta.get("content") or ""
+            if delta:
+                chunks.append(delta)
+                if on_token:
+                    on_token(delta)
+        return "".join(chunks).strip()
+
+    def close(self):
+        """Closes the underlying HTTP session and its pooled connections."""
+        self.session.close()
+
+def get_shared_client(api_key: str) -> OpenRouterClient:
+    """
+    Returns the process-wide client for `api_key`, creating it on first use.
+    Sharing it keeps one pool of warm connections to OpenRouter for the whole session
+    instead of a new TLS handshake for every analyzed video.
+    """
+    with _shared_clients_lock:
+        client = _shared_clients.get(api_key)
+        if client is None:
+            client = _shared_clients[api_key] = OpenRouterClient(api_key)
+        return client
+
+@atexit.register
+def close_shared_clients():
+    """Closes the sessions of the shared clients; runs automatically at interpreter exit."""
+    with _shared_clients_lock:
+        for client in _shared_clients.values():
+            client.close()
+        _shared_clients.clear()
@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+class DiskCache:
+    """A small persistent key/value store that keeps one JSON file per key."""
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for `key`, or None if it is missing or expired."""
+        path = self._path_for(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(f"Ignoring unreadable cache entry '{path.name}': {e}")
+            return None
+        except ValueError as e:
+            logging.warning(f"Removing corrupt cache entry '{path.name}': {e}")
+            path.unlink(missing_ok=True)
+            return None
+        if not isinstance(entry, dict):
+            # Valid JSON, but not an entry this cache wrote.
+            logging.warning(f"Removing malformed cache entry '{path.name}'.")
+            path.unlink(missing_ok=True)
+            return None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        # The modification time doubles as the last-use time for trim().
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def prune(self) -> int:
+        """Deletes every expired entry and returns how many were removed."""
+        removed = 0
+        now = time.time()
+        for path in self.directory.glob("*.json"):
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            expires_at = entry.get("expires_at") if isinstance(entry, dict) else None
+            if expires_at is not None and expires_at < now:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logging.info(f"Removed {removed} expired cache entries from '{self.directory}'.")
+        return removed
+
+    def trim(self, max_entries: int) -> int:
+        """Deletes the least recently used entries beyond `max_entries` and returns how many were removed."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[max_entries:]:
+            path.unlink(missing_ok=True)
+        return max(0, len(entries) - max_entries)
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None):
+        """Stores a JSON-serializable value, optionally expiring after `expire` seconds."""
+        entry = {"value": value, "expires_at": time.time() + expire if expire else None}
+        path = self._path_for(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a half-written entry.
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError as e:
+            logging.warning(f"Could not write cache entry '{path.name}': {e}")
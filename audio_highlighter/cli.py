@@ -0,0 +1,80 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .config import AVAILABLE_WHISPER_MODELS, DEFAULT_WHISPER_MODEL, DEFAULT_LLM_MODEL, OPENROUTER_API_KEY
+from .utils import is_ffmpeg_installed
+from .video_processor import VideoProcessor
+from .youtube_downloader import download_youtube_video
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov", ".wav")
+
+def _collect_videos(inputs: List[str]) -> List[Path]:
+    """Expands the command-line inputs: files are taken as given, directories contribute their videos."""
+    videos = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            videos.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS))
+        elif path.is_file():
+            videos.append(path)
+        else:
+            logging.error(f"Input not found: '{path}'")
+    return videos
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m audio_highlighter.cli",
+        description="Find the interesting moments of videos without the GUI.",
+    )
+    parser.add_argument("inputs", nargs="*", help="video files, or directories of videos")
+    parser.add_argument("--url", action="append", default=[], help="YouTube URL to download and analyze (repeatable)")
+    parser.add_argument("--output-dir", type=Path, default=Path("output"), help="where transcripts, highlights and videos go")
+    parser.add_argument("--download-dir", type=Path, default=Path("videos"), help="where --url downloads are saved")
+    parser.add_argument("--whisper-model", default=DEFAULT_WHISPER_MODEL, choices=AVAILABLE_WHISPER_MODELS)
+    parser.add_argument("--llm-model", default=DEFAULT_LLM_MODEL)
+    parser.add_argument("--batch-size", type=int, default=None, help="speech chunks decoded together by faster-whisper")
+    parser.add_argument("--accurate", action="store_true", help="use beam search instead of greedy decoding")
+    parser.add_argument("--create-video", action="store_true", help="also cut a highlight video from all found moments")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not is_ffmpeg_installed():
+        logging.error("FFmpeg not found. Please install FFmpeg and ensure it is in your system's PATH.")
+        return 1
+    if not OPENROUTER_API_KEY:
+        logging.warning("OPENROUTER_API_KEY is not set; videos will only be transcribed.")
+
+    videos = _collect_videos(args.inputs)
+    for url in args.url:
+        downloaded = download_youtube_video(url, args.download_dir)
+        if downloaded:
+            videos.append(downloaded)
+    if not videos:
+        logging.error("No videos to process.")
+        return 1
+
+    results = VideoProcessor.process_many(
+        videos, args.output_dir, args.whisper_model, args.llm_model,
+        batch_size=args.batch_size, accurate=args.accurate,
+    )
+
+    failures = 0
+    for video, (highlights, _segments) in zip(videos, results):
+        if not highlights:
+            logging.error(f"No highlights were produced for '{video.name}'.")
+            failures += 1
+            continue
+        logging.info(f"'{video.name}': {len(highlights)} highlights.")
+        if args.create_video:
+            processor = VideoProcessor(video, args.output_dir, args.whisper_model, args.llm_model)
+            processor.create_highlight_video([(h['start_time'], h['end_time']) for h in highlights])
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
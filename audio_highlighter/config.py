@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 
 # --- Configuration ---
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
@@ -9,14 +10,86 @@ YOUR_SITE_NAME = ""
 
 # --- Constants ---
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_MODELS_URL = "https://openrouter.ai/api/v1/models"
+REQUEST_TIMEOUT = (5, 60)  # (connect, read) seconds
+LLM_MAX_WORKERS = 4  # concurrent OpenRouter requests
+# Completions started per minute across all requests (OpenRouter's free models allow 20); 0 disables the limit.
+LLM_REQUESTS_PER_MINUTE = 20
+LLM_CHUNK_TOKENS = 4000  # longer transcripts are analyzed chunk by chunk
+LLM_CHUNK_OVERLAP_TOKENS = 200
+# The transcript sent to the LLM has one timestamped line per window of this many seconds rather than one
+# per Whisper segment, which cuts prompt tokens noticeably; highlight times get coarser as it grows (0 disables).
+LLM_TRANSCRIPT_BUCKET_SECONDS = 30
+# Moments from different chunks whose time ranges overlap by more than this share of the shorter one are
+# taken to be the same moment seen in the chunk overlap, and only the first is kept.
+HIGHLIGHT_MERGE_OVERLAP_RATIO = 0.5
 DEFAULT_LLM_MODEL = "deepseek/deepseek-chat-v3-0324:free"
+# "markdown" asks for the Interesting_Moments blocks of prompt.txt; "json" uses prompt_json.txt and OpenRouter's
+# JSON mode, which parses more reliably but is not supported by every model.
+LLM_OUTPUT_FORMAT = os.getenv("LLM_OUTPUT_FORMAT", "markdown")
+LLM_PROMPT_FILES = {"markdown": "prompt.txt", "json": "prompt_json.txt"}
 TEMP_AUDIO_FILENAME_SUFFIX = "_temp_audio.wav"
 TRANSCRIPT_FILENAME_SUFFIX = "_transcript.txt"
 SRT_FILENAME_SUFFIX = "_transcript.srt"
+SEGMENTS_FILENAME_SUFFIX = "_segments.json"
 HIGHLIGHTS_FILENAME_SUFFIX = "_highlights.txt"
 HIGHLIGHT_VIDEO_FILENAME_SUFFIX = "_highlight.mp4"
 DEFAULT_WHISPER_MODEL = "base.en"
+CACHE_DIR = Path.home() / ".cache" / "ai-video-highlighter"
+LLM_CACHE_DIR = CACHE_DIR / "llm"
+TRANSCRIPT_CACHE_DIR = CACHE_DIR / "transcripts"  # Whisper segments keyed by a hash of the audio
+TRANSCRIPT_CACHE_MAX_ENTRIES = 50  # least recently used transcripts beyond this are deleted
+LLM_CACHE_TTL = 30 * 86400  # seconds
+# Bump to invalidate every cached LLM response, e.g. after changing how responses are parsed.
+LLM_CACHE_VERSION = 1
+MODELS_CACHE_TTL = 3600  # seconds
+
+# "copy" cuts clips without re-encoding (fast, cuts snap to keyframes);
+# "reencode" trims and joins in a single ffmpeg pass (frame-accurate, but re-encodes the video);
+# "auto" copies only when every cut already lies within KEYFRAME_SNAP_TOLERANCE_SECONDS of a keyframe,
+# and re-encodes otherwise. The probe only reads the packets within KEYFRAME_PROBE_MARGIN_SECONDS of each
+# clip, so its cost grows with the number of clips rather than with the length of the source.
+HIGHLIGHT_CUT_MODE = "auto"
+KEYFRAME_SNAP_TOLERANCE_SECONDS = 0.5
+# Keyframes are probed this many seconds either side of each clip rather than across the whole source;
+# it should cover the longest keyframe interval (GOP) of the videos being cut.
+KEYFRAME_PROBE_MARGIN_SECONDS = 10
+CLIP_MAX_WORKERS = 8  # concurrent ffmpeg processes when cutting clips in "copy" mode
+
+# DASH fragments yt-dlp downloads in parallel; aria2c is used as the downloader instead when it is installed.
+YTDLP_CONCURRENT_FRAGMENTS = 8
 
 # --- V2.0 Additions ---
 AVAILABLE_WHISPER_MODELS = ["tiny.en", "base.en", "small.en", "medium.en", "large-v3"]
+WHISPER_SAMPLE_RATE = 16000  # Whisper models expect 16 kHz mono audio
+WHISPER_CHUNK_SECONDS = 30  # length of the audio window Whisper decodes at once
+WHISPER_BATCH_SIZE_CUDA = 16  # speech chunks decoded together on the GPU
+WHISPER_BATCH_SIZE_CPU = 4
+# CTranslate2 precisions: "float16" or "int8_float16" use the GPU's FP16 tensor cores; "int8" suits CPUs.
+WHISPER_COMPUTE_TYPE_CUDA = "int8_float16"
+WHISPER_COMPUTE_TYPE_CPU = "int8"
+# Greedy, single-pass decoding. Highlights only need a transcript that is good enough to find moments in,
+# so this trades a little word-level accuracy for several times fewer decoder passes: no beam search,
+# no temperature fallback re-decodes, and no conditioning that lets one bad window derail the next.
+# openai-whisper already decodes greedily at temperature 0 (and rejects best_of there), so beam_size and
+# best_of are only passed to faster-whisper.
+WHISPER_DECODE_OPTIONS = {"temperature": 0.0, "condition_on_previous_text": False, "no_speech_threshold": 0.6}
+WHISPER_FASTER_DECODE_OPTIONS = {"beam_size": 1, "best_of": 1}
+# VideoProcessor(accurate=True) opts back into beam search. openai-whisper and whisper.cpp also keep their
+# default temperature fallback; faster-whisper's batched pipeline only ever decodes at the first temperature
+# (0), so there accurate means beam search alone.
+WHISPER_ACCURATE_DECODE_OPTIONS = {"beam_size": 5, "best_of": 5}
+# Silero VAD settings for skipping silence; pauses shorter than this stay inside a speech chunk.
+WHISPER_VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+# In VideoProcessor.process_many, videos are transcribed together when the longest of a group is at most this much longer than the shortest.
+BATCH_GROUP_MAX_DURATION_RATIO = 1.5
+# Transcription engine: "faster" (faster-whisper, default), "openai" (openai-whisper, must be installed
+# separately) or "cpp" (the whisper.cpp CLI, fastest on CPU-only machines).
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "faster")
+WHISPER_CPP_BINARY = "whisper-cli"
+# ggml model files for whisper.cpp; quantized variants (e.g. "ggml-base.en-q5_0.bin") work too.
+WHISPER_CPP_MODEL_PATH = "models/ggml-{model}.bin"
+# Graph-compile the openai-whisper encoder and decoder with torch.compile on CUDA ("1" to enable). The first
+# load of each model pays a compile of tens of seconds, so this only pays off for long or many videos.
+WHISPER_TORCH_COMPILE = os.getenv("WHISPER_TORCH_COMPILE") == "1"
 # The list of available LLM models will now be fetched dynamically.
\ No newline at end of file
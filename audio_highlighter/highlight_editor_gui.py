@@ -1,11 +1,46 @@
 import customtkinter as ctk
 import logging
+import tkinter
+import tkinter.font
 from typing import List, Dict, Callable, Tuple, Optional, Any
 from customtkinter import filedialog
 from pathlib import Path
 
 from .utils import export_highlights_to_txt, export_transcript_to_srt
 
+ROW_HEIGHT = 84  # pixels reserved for each highlight in the list
+ROW_GAP = 8
+WHY_WRAP_LENGTH = 700
+WHY_MAX_LINES = 2  # what fits under the title in ROW_HEIGHT; longer reasons are cut short with an ellipsis
+
+def _elide_to_lines(text: str, font: tkinter.font.Font, width: int, max_lines: int) -> str:
+    """Wraps text at word boundaries like the label would and cuts it to max_lines, ending the last one with '…'."""
+    lines: List[str] = []
+    words = text.split()
+    while words and len(lines) < max_lines:
+        line = words.pop(0)
+        while words and font.measure(f"{line} {words[0]}") <= width:
+            line = f"{line} {words.pop(0)}"
+        lines.append(line)
+        if font.measure(line) > width:
+            break  # a single word wider than the label; Tk would break it across lines of its own
+    if lines and (words or font.measure(lines[-1]) > width):
+        last = lines[-1]
+        while last and font.measure(f"{last}…") > width:
+            last = last[:-1]
+        lines[-1] = f"{last.rstrip()}…"
+    return "\n".join(lines)
+
+class _HighlightRow:
+    """A pooled set of widgets that can display any highlight of the list."""
+    def __init__(self, frame: ctk.CTkFrame, window_id: int, check: ctk.CTkCheckBox, title_label: ctk.CTkLabel, why_label: ctk.CTkLabel):
+        self.frame = frame
+        self.window_id = window_id
+        self.check = check
+        self.title_label = title_label
+        self.why_label = why_label
+        self.index: Optional[int] = None
+
 class HighlightEditorWindow(ctk.CTkToplevel):
     """A Toplevel window for editing and selecting video highlights."""
     
@@ -19,7 +54,12 @@ class HighlightEditorWindow(ctk.CTkToplevel):
         self.highlights = highlights
         self.transcript_segments = transcript_segments
         self.start_creation_callback = start_creation_callback
-        self.checkbox_vars = []
+        # Selection lives in a plain list; only the visible rows have widgets.
+        self._selected: List[bool] = [True] * len(highlights)
+        self._selected_count = len(highlights)
+        self._row_pool: List[_HighlightRow] = []
+        # Shared by every why label, and used to measure where their text wraps.
+        self._why_font = ctk.CTkFont()
 
         self.main_frame = ctk.CTkFrame(self)
         self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -50,32 +90,120 @@ class HighlightEditorWindow(ctk.CTkToplevel):
         self.create_video_button = ctk.CTkButton(self.action_frame, text="Create Video", command=self.create_video_action, fg_color="green", hover_color="darkgreen")
         self.create_video_button.pack(side="left")
 
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.main_frame, label_text="Select Highlights to Include")
-        self.scrollable_frame.grid(row=1, column=0, sticky="nsew")
-        self.scrollable_frame.grid_columnconfigure(0, weight=1)
+        self.list_frame = ctk.CTkFrame(self.main_frame)
+        self.list_frame.grid(row=1, column=0, sticky="nsew")
+        self.list_frame.grid_columnconfigure(0, weight=1)
+        self.list_frame.grid_rowconfigure(1, weight=1)
+
+        self.list_label = ctk.CTkLabel(self.list_frame, text="Select Highlights to Include")
+        self.list_label.grid(row=0, column=0, columnspan=2, pady=5)
+
+        self.canvas = ctk.CTkCanvas(self.list_frame, highlightthickness=0, bg=self._canvas_bg(), yscrollincrement=ROW_HEIGHT // 3)
+        self.canvas.grid(row=1, column=0, sticky="nsew", padx=(5, 0), pady=(0, 5))
+        self.scrollbar = ctk.CTkScrollbar(self.list_frame, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns", pady=(0, 5))
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.bind("<Configure>", self._render_visible_rows)
+        self._bind_mouse_wheel(self.canvas)
 
         self.populate_highlights()
 
+    def _canvas_bg(self) -> str:
+        """The list frame's colour for the current appearance mode; a plain Tk canvas does not follow it by itself."""
+        return self._apply_appearance_mode(self.list_frame.cget("fg_color"))
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        if hasattr(self, "canvas"):
+            self.canvas.configure(bg=self._canvas_bg())
+
     def populate_highlights(self):
-        """Dynamically create checkboxes and labels for each highlight."""
-        for i, highlight in enumerate(self.highlights):
-            var = ctk.BooleanVar(value=True)
-            
-            entry_frame = ctk.CTkFrame(self.scrollable_frame)
-            entry_frame.grid(row=i, column=0, sticky="ew", padx=5, pady=(0, 8))
-            entry_frame.grid_columnconfigure(1, weight=1)
+        """Sizes the virtual list; row widgets are created and recycled as the view scrolls."""
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.highlights) * ROW_HEIGHT))
+        self._render_visible_rows()
 
-            check = ctk.CTkCheckBox(entry_frame, text="", variable=var, width=20)
-            check.grid(row=0, column=0, rowspan=2, padx=10, pady=10, sticky="ns")
-            
-            title_text = f"{i+1}. {highlight.get('title', 'No Title')}  ({highlight.get('start_time')} -> {highlight.get('end_time')})"
-            title_label = ctk.CTkLabel(entry_frame, text=title_text, font=ctk.CTkFont(weight="bold"), anchor="w")
-            title_label.grid(row=0, column=1, sticky="ew", padx=(0, 10), pady=(5, 0))
+    def _create_row(self) -> _HighlightRow:
+        """Builds one reusable row of widgets inside the canvas."""
+        entry_frame = ctk.CTkFrame(self.canvas)
+        entry_frame.grid_columnconfigure(1, weight=1)
+        window_id = self.canvas.create_window(0, 0, window=entry_frame, anchor="nw", height=ROW_HEIGHT - ROW_GAP, state="hidden")
 
-            why_label = ctk.CTkLabel(entry_frame, text=f"Reason: {highlight.get('why', 'N/A')}", wraplength=700, anchor="w", justify="left", text_color="gray")
-            why_label.grid(row=1, column=1, sticky="ew", padx=(0, 10), pady=(0, 5))
-            
-            self.checkbox_vars.append(var)
+        check = ctk.CTkCheckBox(entry_frame, text="", width=20)
+        check.grid(row=0, column=0, rowspan=2, padx=10, pady=10, sticky="ns")
+
+        title_label = ctk.CTkLabel(entry_frame, text="", font=ctk.CTkFont(weight="bold"), anchor="w")
+        title_label.grid(row=0, column=1, sticky="ew", padx=(0, 10), pady=(5, 0))
+
+        why_label = ctk.CTkLabel(entry_frame, text="", font=self._why_font, wraplength=WHY_WRAP_LENGTH, anchor="w", justify="left", text_color="gray")
+        why_label.grid(row=1, column=1, sticky="ew", padx=(0, 10), pady=(0, 5))
+
+        row = _HighlightRow(entry_frame, window_id, check, title_label, why_label)
+        check.configure(command=lambda: self._toggle(row))
+        self._bind_mouse_wheel(entry_frame)
+        return row
+
+    def _show_highlight_in_row(self, row: _HighlightRow, index: int):
+        """Points a pooled row at a different highlight."""
+        highlight = self.highlights[index]
+        row.index = index
+        row.title_label.configure(text=f"{index+1}. {highlight.get('title', 'No Title')}  ({highlight.get('start_time')} -> {highlight.get('end_time')})")
+        # Rows have a fixed height, so a long reason is cut to the lines that fit instead of spilling out of its row.
+        why = _elide_to_lines(f"Reason: {highlight.get('why', 'N/A')}", self._why_font, WHY_WRAP_LENGTH, WHY_MAX_LINES)
+        row.why_label.configure(text=why)
+        self._show_selection(row)
+
+    def _render_visible_rows(self, event=None):
+        """Places pooled rows over the highlights that are currently in view."""
+        view_top = self.canvas.canvasy(0)
+        view_height = self.canvas.winfo_height()
+        first = max(0, int(view_top // ROW_HEIGHT))
+        last = min(len(self.highlights), int((view_top + view_height) // ROW_HEIGHT) + 1)
+
+        while len(self._row_pool) < last - first:
+            self._row_pool.append(self._create_row())
+
+        width = self.canvas.winfo_width()
+        for slot, row in enumerate(self._row_pool):
+            index = first + slot
+            if index < last:
+                if row.index != index:
+                    self._show_highlight_in_row(row, index)
+                self.canvas.coords(row.window_id, 0, index * ROW_HEIGHT)
+                self.canvas.itemconfigure(row.window_id, width=width, state="normal")
+            else:
+                row.index = None
+                self.canvas.itemconfigure(row.window_id, state="hidden")
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._render_visible_rows()
+
+    def _on_mouse_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-1, "units")
+        elif event.num == 5 or event.delta < 0:
+            self.canvas.yview_scroll(1, "units")
+        self._render_visible_rows()
+
+    def _bind_mouse_wheel(self, widget):
+        """Routes wheel events from a widget and all of its descendants to the list."""
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tkinter.Misc.bind(widget, sequence, self._on_mouse_wheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_mouse_wheel(child)
+
+    def _show_selection(self, row: _HighlightRow):
+        if self._selected[row.index]:
+            row.check.select()
+        else:
+            row.check.deselect()
+
+    def _toggle(self, row: _HighlightRow):
+        """Flips the selection of the highlight a row is showing and updates the counter."""
+        if row.index is None:
+            return
+        self._selected[row.index] = not self._selected[row.index]
+        self._selected_count += 1 if self._selected[row.index] else -1
 
     def export_highlights_action(self):
         """Opens a file dialog to save highlights as a .txt file."""
@@ -107,19 +235,18 @@ class HighlightEditorWindow(ctk.CTkToplevel):
 
     def toggle_all_checkboxes(self):
         """Selects or deselects all highlight checkboxes."""
-        current_states = [var.get() for var in self.checkbox_vars]
-        new_state = not all(current_states)
-        for var in self.checkbox_vars:
-            var.set(new_state)
+        new_state = self._selected_count != len(self._selected)
+        self._selected = [new_state] * len(self._selected)
+        for row in self._row_pool:
+            if row.index is not None:
+                self._show_selection(row)
+        self._selected_count = len(self._selected) if new_state else 0
 
     def create_video_action(self):
         """Gathers selected highlights and triggers the video creation process."""
         self.create_video_button.configure(state="disabled", text="Please wait...")
         
-        selected_highlights = []
-        for i, checkbox_var in enumerate(self.checkbox_vars):
-            if checkbox_var.get():
-                selected_highlights.append(self.highlights[i])
+        selected_highlights = [h for h, selected in zip(self.highlights, self._selected) if selected]
 
         if not selected_highlights:
             logging.warning("No highlights were selected. Aborting video creation.")
@@ -1,55 +1,242 @@
+import functools
 import logging
+import shutil
 import subprocess
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
 from pathlib import Path
 
-def is_ffmpeg_installed():
+import numpy as np
+
+SRT_WRITE_BATCH_SIZE = 4096  # segments per write
+SRT_WRITE_BUFFER_SIZE = 1024 * 1024  # bytes
+_TIMESTAMP_PATTERN = "%02d:%02d:%02d"
+_SRT_TIMESTAMP_PATTERN = "%02d:%02d:%02d,%03d"
+_SRT_TIMESTAMP_TEMPLATE = b"00:00:00,000"
+_SRT_DIGIT_COLUMNS = (0, 1, 3, 4, 6, 7, 9, 10, 11)  # byte offsets of the digits in the template
+# Hardware decoders to try for re-encoding, best first.
+HWACCEL_PREFERENCE = ("cuda", "videotoolbox", "d3d11va", "qsv", "vaapi")
+# Hardware H.264 encoders to try for re-encoding, best first, with the options each one is run with;
+# without an explicit bitrate some of them fall back to a very low default.
+HW_ENCODER_PREFERENCE = {
+    "h264_nvenc": ("-preset", "p4", "-b:v", "5M"),
+    "h264_videotoolbox": ("-b:v", "5M"),
+    "h264_qsv": ("-preset", "medium", "-b:v", "5M"),
+    "h264_amf": ("-quality", "balanced", "-b:v", "5M"),
+}
+# Keeps ffmpeg's stderr down to actual errors: no banner, per-stream details or progress lines.
+FFMPEG_LOG_ARGS = ("-hide_banner", "-loglevel", "error", "-nostats")
+
+@functools.lru_cache(maxsize=1)
+def is_ffmpeg_installed() -> bool:
     """Checks if FFmpeg is installed and accessible in the system's PATH."""
+    # A PATH lookup is enough here and avoids spawning a process; the result is cached.
+    return shutil.which("ffmpeg") is not None
+
+@functools.lru_cache(maxsize=1)
+def get_ffmpeg_hwaccel() -> Optional[str]:
+    """
+    Returns the first hardware decoding method from HWACCEL_PREFERENCE that actually works here, or None.
+    `ffmpeg -hwaccels` only lists what the build supports, so each candidate's device is also
+    initialized once; the result is cached for the lifetime of the process.
+    """
+    try:
+        listed = subprocess.run(["ffmpeg", "-hide_banner", "-hwaccels"], check=True, capture_output=True, text=True).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    for hwaccel in HWACCEL_PREFERENCE:
+        if hwaccel not in listed:
+            continue
+        probe = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-init_hw_device", hwaccel, "-f", "lavfi", "-i", "nullsrc", "-frames:v", "1", "-f", "null", "-"]
+        if subprocess.run(probe, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0:
+            logging.info(f"Using ffmpeg hardware decoding: {hwaccel}")
+            return hwaccel
+    return None
+
+@functools.lru_cache(maxsize=1)
+def get_ffmpeg_video_encoder_args() -> Tuple[str, ...]:
+    """
+    Returns the "-c:v ..." arguments for the first encoder from HW_ENCODER_PREFERENCE that can encode here,
+    or an empty tuple to keep ffmpeg's default (software) encoder. Like get_ffmpeg_hwaccel, every listed
+    candidate also encodes one test frame, since a build can ship an encoder without the hardware for it.
+    """
     try:
-        # Use a version command that is quiet and returns success
-        subprocess.run(["ffmpeg", "-version"], check=True, capture_output=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+        listed = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], check=True, capture_output=True, text=True).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        return ()
+    for encoder, options in HW_ENCODER_PREFERENCE.items():
+        if encoder not in listed:
+            continue
+        probe = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "color=size=256x256", "-frames:v", "1", "-c:v", encoder, "-f", "null", "-"]
+        if subprocess.run(probe, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0:
+            logging.info(f"Using ffmpeg hardware encoder: {encoder}")
+            return ("-c:v", encoder, *options)
+    return ()
+
+def run_quiet(command: List[str], stdout: Any = subprocess.DEVNULL, input: Optional[bytes] = None) -> subprocess.CompletedProcess:
+    """
+    Runs a command (typically ffmpeg with FFMPEG_LOG_ARGS) and captures its stderr, which then only
+    holds error messages; a failure raises CalledProcessError with that stderr attached.
+    `input`, if given, is written to the command's stdin.
+    """
+    return subprocess.run(command, check=True, stdout=stdout, stderr=subprocess.PIPE, input=input)
+
+def run_ffmpeg_with_progress(command: List[str], duration: float, on_progress: Callable[[float], None]) -> subprocess.CompletedProcess:
+    """
+    Runs an ffmpeg command like run_quiet, with "-progress pipe:1" inserted before its output, and calls
+    `on_progress` with the completed fraction (0-1) of `duration` seconds of output as ffmpeg reports it.
+    """
+    command = [*command[:-1], "-progress", "pipe:1", command[-1]]
+    with subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as process:
+        # ffmpeg writes a block of key=value lines about twice a second. With FFMPEG_LOG_ARGS stderr
+        # only carries error messages, far too little to fill its pipe while stdout is being read.
+        for line in process.stdout:
+            key, _, value = line.partition("=")
+            if key == "out_time_us" and value.strip().isdigit() and duration > 0:
+                on_progress(min(1.0, int(value) / 1e6 / duration))
+        stderr = process.stderr.read()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr.encode())
+    return subprocess.CompletedProcess(command, process.returncode, stderr=stderr.encode())
+
+def _format_timestamp_ms(ms: int, srt_format: bool = False) -> str:
+    """Formats a non-negative integer number of milliseconds; see format_timestamp."""
+    # Floor division and subtraction compile to plain BINARY_OPs, avoiding divmod's call and result tuple.
+    h = ms // 3_600_000
+    ms -= h * 3_600_000
+    m = ms // 60_000
+    ms -= m * 60_000
+    s = ms // 1000
+    ms -= s * 1000
+    # %-formatting of zero-padded ints is over twice as fast as the equivalent f-string format specs.
+    if srt_format:
+        return _SRT_TIMESTAMP_PATTERN % (h, m, s, ms)
+    return _TIMESTAMP_PATTERN % (h, m, s)
 
 def format_timestamp(seconds: float, srt_format: bool = False) -> str:
     """Formats time in seconds to HH:MM:SS or HH:MM:SS,ms for SRT."""
     assert seconds >= 0, "non-negative timestamp expected"
-    s_int = int(seconds)
-    ms = int((seconds - s_int) * 1000)
-    m, s = divmod(s_int, 60)
-    h, m = divmod(m, 60)
-    if srt_format:
-        return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
-    return f"{h:02d}:{m:02d}:{s:02d}"
+    return _format_timestamp_ms(round(seconds * 1000), srt_format)
+
+def _timestamp_fields(seconds: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Splits many timestamps into hour, minute, second and millisecond arrays in one vectorized pass."""
+    # np.rint rounds half to even on the same float product as round(), so results match format_timestamp.
+    ms = np.rint(np.asarray(seconds, dtype=np.float64) * 1000).astype(np.int64)
+    assert not (ms < 0).any(), "non-negative timestamps expected"
+    hours, ms = np.divmod(ms, 3_600_000)
+    minutes, ms = np.divmod(ms, 60_000)
+    secs, ms = np.divmod(ms, 1000)
+    return hours, minutes, secs, ms
+
+def format_timestamps(seconds: Sequence[float], srt_format: bool = False) -> List[str]:
+    """Vectorized format_timestamp for a whole list of times."""
+    hours, minutes, secs, ms = _timestamp_fields(seconds)
+    count = len(hours)
+    if count and hours.max() >= 100:
+        # Three-digit hours do not fit the fixed-width rendering below.
+        fields = zip(hours.tolist(), minutes.tolist(), secs.tolist(), ms.tolist())
+        if srt_format:
+            return [_SRT_TIMESTAMP_PATTERN % f for f in fields]
+        return [_TIMESTAMP_PATTERN % f[:3] for f in fields]
+    # Every digit is written straight into a buffer of "HH:MM:SS,mmm" templates, which is then decoded
+    # once and sliced, instead of formatting each timestamp separately.
+    buffer = np.frombuffer(_SRT_TIMESTAMP_TEMPLATE * count, dtype=np.uint8).reshape(count, len(_SRT_TIMESTAMP_TEMPLATE)).copy()
+    for column, digits in zip(_SRT_DIGIT_COLUMNS, (hours // 10, hours % 10, minutes // 10, minutes % 10, secs // 10, secs % 10,
+                                                   ms // 100, ms // 10 % 10, ms % 10)):
+        buffer[:, column] += digits.astype(np.uint8)
+    text = buffer.tobytes().decode("ascii")
+    stride = len(_SRT_TIMESTAMP_TEMPLATE)
+    width = stride if srt_format else 8
+    return [text[i:i + width] for i in range(0, count * stride, stride)]
+
+def format_transcript(transcript_segments: List[Dict[str, Any]]) -> str:
+    """Renders segments as the "[HH:MM:SS] text" lines of the plain-text transcript given to the LLM."""
+    starts = format_timestamps([segment['start'] for segment in transcript_segments])
+    return "".join(f"[{start}] {segment['text'].strip()}\n" for start, segment in zip(starts, transcript_segments))
+
+def format_transcript_compact(transcript_segments: List[Dict[str, Any]], bucket_seconds: float) -> str:
+    """
+    Like format_transcript, but merges consecutive segments into one line per `bucket_seconds` window,
+    so the LLM prompt carries one timestamp per window instead of one per (often very short) segment.
+    """
+    if bucket_seconds <= 0:
+        return format_transcript(transcript_segments)
+    return "".join(iter_transcript_compact(transcript_segments, bucket_seconds))
+
+def iter_transcript_compact(transcript_segments: Iterable[Dict[str, Any]], bucket_seconds: float) -> Iterator[str]:
+    """
+    Yields the lines of format_transcript_compact one at a time, each as soon as its window is complete,
+    so segments can be consumed while they are still being transcribed.
+    """
+    line_start = None
+    texts: List[str] = []
+    for segment in transcript_segments:
+        if line_start is None or bucket_seconds <= 0 or segment['start'] >= line_start + bucket_seconds:
+            if texts:
+                yield f"[{format_timestamp(line_start)}] {' '.join(texts)}\n"
+            line_start = segment['start']
+            texts = []
+        text = segment['text'].strip()
+        if text or bucket_seconds <= 0:
+            texts.append(text)
+    if texts:
+        yield f"[{format_timestamp(line_start)}] {' '.join(texts)}\n"
+
+def parse_timestamp(timestamp: str) -> float:
+    """Parses an HH:MM:SS (optionally HH:MM:SS,ms or HH:MM:SS.ms) timestamp into seconds."""
+    hours, minutes, seconds = timestamp.strip().replace(",", ".").split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
 
 def export_highlights_to_txt(highlights_data: List[Dict[str, str]], output_path: Path):
     """Formats the list of highlights into a human-readable .txt file."""
     logging.info(f"Exporting {len(highlights_data)} highlights to {output_path}...")
+    body = "".join(
+        f"{i + 1}.\n"
+        f"  Title: {highlight.get('title', 'N/A')}\n"
+        f"  Time: {highlight.get('start_time')} -> {highlight.get('end_time')}\n"
+        f"  Reason: {highlight.get('why', 'N/A')}\n\n"
+        for i, highlight in enumerate(highlights_data)
+    )
     try:
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("AI-Generated Video Highlights\n")
-            f.write("="*30 + "\n\n")
-            for i, highlight in enumerate(highlights_data):
-                f.write(f"{i + 1}.\n")
-                f.write(f"  Title: {highlight.get('title', 'N/A')}\n")
-                f.write(f"  Time: {highlight.get('start_time')} -> {highlight.get('end_time')}\n")
-                f.write(f"  Reason: {highlight.get('why', 'N/A')}\n\n")
+        output_path.write_text(f"AI-Generated Video Highlights\n{'=' * 30}\n\n{body}", encoding="utf-8")
         logging.info(f"Successfully exported highlights to '{output_path.name}'.")
-    except Exception as e:
+    except OSError as e:
         logging.error(f"Failed to export highlights to .txt: {e}")
 
 def export_transcript_to_srt(transcript_segments: List[Dict[str, Any]], output_path: Path):
     """Formats whisper output (segments with timestamps) into .srt format."""
     logging.info(f"Exporting transcript to {output_path}...")
     try:
-        with open(output_path, "w", encoding="utf-8") as f:
-            for i, segment in enumerate(transcript_segments):
-                f.write(f"{i + 1}\n")
-                start = format_timestamp(segment['start'], srt_format=True)
-                end = format_timestamp(segment['end'], srt_format=True)
-                f.write(f"{start} --> {end}\n")
-                f.write(f"{segment['text'].strip()}\n\n")
+        with open(output_path, "w", encoding="utf-8", buffering=SRT_WRITE_BUFFER_SIZE) as f:
+            # Build entries in batches and write each batch at once to keep peak memory bounded.
+            for batch_start in range(0, len(transcript_segments), SRT_WRITE_BATCH_SIZE):
+                batch = transcript_segments[batch_start:batch_start + SRT_WRITE_BATCH_SIZE]
+                starts = format_timestamps([segment['start'] for segment in batch], srt_format=True)
+                ends = format_timestamps([segment['end'] for segment in batch], srt_format=True)
+                f.write("".join(
+                    f"{i}\n{start} --> {end}\n{segment['text'].strip()}\n\n"
+                    for i, segment, start, end in zip(range(batch_start + 1, batch_start + len(batch) + 1), batch, starts, ends)
+                ))
         logging.info(f"Successfully exported transcript to '{output_path.name}'.")
     except Exception as e:
-        logging.error(f"Failed to export transcript to .srt: {e}")
\ No newline at end of file
+        logging.error(f"Failed to export transcript to .srt: {e}")
+
+def export_transcript_files(transcript_segments: List[Dict[str, Any]], transcript_path: Path, srt_path: Path):
+    """
+    Writes the plain-text transcript and the .srt file in a single pass over the segments,
+    one batch at a time, so neither file is ever held in memory as a whole.
+    """
+    with open(transcript_path, "w", encoding="utf-8", buffering=SRT_WRITE_BUFFER_SIZE) as txt_file, \
+            open(srt_path, "w", encoding="utf-8", buffering=SRT_WRITE_BUFFER_SIZE) as srt_file:
+        for batch_start in range(0, len(transcript_segments), SRT_WRITE_BATCH_SIZE):
+            batch = transcript_segments[batch_start:batch_start + SRT_WRITE_BATCH_SIZE]
+            # The start times are rendered once; the plain transcript uses their HH:MM:SS prefix.
+            starts = format_timestamps([segment['start'] for segment in batch], srt_format=True)
+            ends = format_timestamps([segment['end'] for segment in batch], srt_format=True)
+            texts = [segment['text'].strip() for segment in batch]
+            txt_file.write("".join(f"[{start[:-4]}] {text}\n" for start, text in zip(starts, texts)))
+            srt_file.write("".join(
+                f"{i}\n{start} --> {end}\n{text}\n\n"
+                for i, start, end, text in zip(range(batch_start + 1, batch_start + len(batch) + 1), starts, ends, texts)
+            ))
+    logging.info(f"Transcript saved to {transcript_path}")
+    logging.info(f"Successfully exported transcript to '{srt_path.name}'.")
@@ -1,35 +1,496 @@
+import bisect
+import functools
+import hashlib
+import json
 import logging
-import re
+import os
+import queue
+import shutil
 import subprocess
 import tempfile
+import threading
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Callable
 
-import whisper
+import ctranslate2
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 
-from .api_client import OpenRouterClient
+from .api_client import get_shared_client
+from .cache import DiskCache
 from .config import (
-    OPENROUTER_API_KEY, TRANSCRIPT_FILENAME_SUFFIX, SRT_FILENAME_SUFFIX,
+    OPENROUTER_API_KEY, TRANSCRIPT_FILENAME_SUFFIX, SRT_FILENAME_SUFFIX, SEGMENTS_FILENAME_SUFFIX,
     HIGHLIGHTS_FILENAME_SUFFIX, TEMP_AUDIO_FILENAME_SUFFIX,
-    HIGHLIGHT_VIDEO_FILENAME_SUFFIX
+    HIGHLIGHT_VIDEO_FILENAME_SUFFIX, WHISPER_BATCH_SIZE_CUDA, WHISPER_BATCH_SIZE_CPU,
+    WHISPER_COMPUTE_TYPE_CUDA, WHISPER_COMPUTE_TYPE_CPU, HIGHLIGHT_CUT_MODE, KEYFRAME_SNAP_TOLERANCE_SECONDS,
+    WHISPER_BACKEND, WHISPER_CPP_BINARY, WHISPER_CPP_MODEL_PATH, WHISPER_SAMPLE_RATE,
+    WHISPER_CHUNK_SECONDS, BATCH_GROUP_MAX_DURATION_RATIO, WHISPER_DECODE_OPTIONS,
+    WHISPER_FASTER_DECODE_OPTIONS, WHISPER_ACCURATE_DECODE_OPTIONS, WHISPER_TORCH_COMPILE, WHISPER_VAD_PARAMETERS, CLIP_MAX_WORKERS, LLM_TRANSCRIPT_BUCKET_SECONDS,
+    KEYFRAME_PROBE_MARGIN_SECONDS, HIGHLIGHT_MERGE_OVERLAP_RATIO,
+    TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_ENTRIES
 )
-from .utils import format_timestamp, export_transcript_to_srt
+from .utils import FFMPEG_LOG_ARGS, parse_timestamp, export_transcript_files, format_transcript_compact, iter_transcript_compact, run_quiet, run_ffmpeg_with_progress, get_ffmpeg_hwaccel, get_ffmpeg_video_encoder_args
+
+# orjson is an optional speed-up for the segments sidecar, which holds one entry per Whisper segment.
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    _json_loads = json.loads
+
+_whisper_model_lock = threading.Lock()
+# Finished transcriptions keyed by the decoded audio, so a renamed or re-downloaded video is not transcribed twice.
+_transcript_cache = DiskCache(TRANSCRIPT_CACHE_DIR)
+
+# Silence between the videos of a batched group, so their clips can never meet at a boundary.
+_GROUP_GAP_SAMPLES = WHISPER_SAMPLE_RATE
+
+# Field names of one moment in the LLM's markdown highlights.
+_MOMENT_FIELDS = ("Title:", "Start_Time:", "End_Time:", "Why_Interesting:")
+_JSON_DECODER = json.JSONDecoder()
+
+@functools.lru_cache(maxsize=2)
+def _load_whisper_model(name: str, device: str, compute_type: str) -> WhisperModel:
+    # On a multi-GPU machine the model is replicated on every device; CTranslate2 then runs
+    # concurrent transcriptions from different threads on different GPUs.
+    device_index = list(range(ctranslate2.get_cuda_device_count())) if device == "cuda" else 0
+    return WhisperModel(name, device=device, device_index=device_index, compute_type=compute_type)
+
+@functools.lru_cache(maxsize=2)
+def _load_openai_whisper_model(name: str, device: str):
+    # openai-whisper pulls in PyTorch, so it is only imported when that backend is selected.
+    import whisper
+    model = whisper.load_model(name, device=device)
+    if WHISPER_TORCH_COMPILE and device == "cuda":
+        _compile_openai_whisper_model(model)
+    return model
+
+def _compile_openai_whisper_model(model):
+    """Wraps the encoder and decoder in torch.compile and runs the encoder once so the compile happens at load time."""
+    import torch
+    # Inductor's on-disk graph cache lets later processes skip most of the recompilation.
+    os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+    logging.info("Compiling the openai-whisper model with torch.compile; the first load takes a while...")
+    # The encoder always sees one 30s mel window, so CUDA graphs apply; the decoder's input grows token by token.
+    model.encoder = torch.compile(model.encoder, mode="reduce-overhead")
+    model.decoder = torch.compile(model.decoder, dynamic=True)
+    with torch.no_grad():
+        model.embed_audio(torch.zeros(1, model.dims.n_mels, model.dims.n_audio_ctx * 2, device="cuda", dtype=torch.float16))
+
+def _select_torch_device() -> str:
+    """Picks the PyTorch device for openai-whisper, making a silent CPU fallback visible in the log."""
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    logging.info("No CUDA device visible to PyTorch; openai-whisper will run on the CPU in fp32.")
+    return "cpu"
+
+@functools.lru_cache(maxsize=1)
+def _resolve_whisper_backend() -> str:
+    """Returns the WHISPER_BACKEND that will actually be used, falling back when whisper.cpp is missing."""
+    if WHISPER_BACKEND == "cpp" and not shutil.which(WHISPER_CPP_BINARY):
+        logging.warning(f"'{WHISPER_CPP_BINARY}' was not found in PATH; falling back to faster-whisper.")
+        return "faster"
+    return WHISPER_BACKEND
+
+def _select_whisper_device() -> Tuple[str, str]:
+    """Picks the inference device and precision: the GPU whenever CTranslate2 can see one."""
+    if ctranslate2.get_cuda_device_count() > 0:
+        return "cuda", WHISPER_COMPUTE_TYPE_CUDA
+    logging.info("No CUDA device visible to CTranslate2; Whisper will run on the CPU.")
+    return "cpu", WHISPER_COMPUTE_TYPE_CPU
+
+def _get_whisper_model(name: str, device: str, compute_type: str) -> WhisperModel:
+    """Returns a process-wide cached Whisper model, loading it on first use."""
+    # The lock keeps two threads that miss the cache at the same time from loading the weights twice.
+    with _whisper_model_lock:
+        return _load_whisper_model(name, device, compute_type)
+
+def _get_openai_whisper_model(name: str, device: str):
+    """Returns a process-wide cached openai-whisper model, loading it on first use."""
+    with _whisper_model_lock:
+        before = _load_openai_whisper_model.cache_info()
+        model = _load_openai_whisper_model(name, device)
+        after = _load_openai_whisper_model.cache_info()
+        if device == "cuda" and after.misses > before.misses and before.currsize == before.maxsize:
+            # Loading this model evicted another; PyTorch keeps freed blocks reserved, so return them to the
+            # driver now rather than after every video, which would only force them to be reallocated.
+            import torch
+            torch.cuda.empty_cache()
+        return model
+
+def preload_whisper_model(name: str):
+    """
+    Loads the Whisper model the selected backend will use into the process-wide cache, so a later
+    VideoProcessor with the same model starts transcribing at once. Meant to run in a background thread.
+    """
+    backend = _resolve_whisper_backend()
+    try:
+        if backend == "faster":
+            _get_whisper_model(name, *_select_whisper_device())
+        elif backend == "openai":
+            _get_openai_whisper_model(name, _select_torch_device())
+        else:
+            # whisper.cpp loads its model in every run of the CLI; there is nothing to keep warm.
+            return
+        logging.info(f"Whisper model '{name}' is loaded.")
+    except Exception as e:
+        # The analysis loads the model again and reports the failure in context.
+        logging.warning(f"Could not preload Whisper model '{name}': {e}")
+
+def _probe_duration(path: Path) -> float:
+    """Returns a media file's duration in seconds according to ffprobe, or 0.0 if it cannot be read."""
+    command = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", str(path)]
+    try:
+        return float(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return 0.0
+
+def _probe_keyframes(path: Path, ranges: List[Tuple[float, float]]) -> List[float]:
+    """
+    Returns the sorted keyframe timestamps of a file's first video stream around the given (start, end)
+    ranges, or [] if they cannot be read.
+    """
+    # Packet flags come straight from the container index, so nothing has to be decoded. Only the packets
+    # near each clip are read: ffprobe seeks to every interval instead of demuxing the whole source.
+    margin = KEYFRAME_PROBE_MARGIN_SECONDS
+    intervals = ",".join(f"{max(0.0, start - margin)}%{end + margin}" for start, end in ranges)
+    command = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-read_intervals", intervals,
+               "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", str(path)]
+    try:
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    keyframes = set()
+    for line in output.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.add(float(pts_time))
+    # Overlapping intervals report the same packets more than once.
+    return sorted(keyframes)
+
+def _snap_to_keyframes(start: float, end: float, keyframes: List[float]) -> Tuple[float, float]:
+    """Widens a range so it starts on the keyframe at or before `start` and ends on the first one at or after `end`."""
+    start_index = bisect.bisect_right(keyframes, start) - 1
+    end_index = bisect.bisect_left(keyframes, end)
+    # Keyframes are only probed near each clip, so with none before `start` the cut is left to ffmpeg's seek.
+    snapped_start = keyframes[start_index] if start_index >= 0 else start
+    # Past the last keyframe the clip simply runs to the requested end.
+    snapped_end = keyframes[end_index] if end_index < len(keyframes) else end
+    return snapped_start, snapped_end
+
+def _cuts_near_keyframes(ranges: List[Tuple[float, float]], keyframes: List[float], tolerance: float) -> bool:
+    """True when snapping every range to the keyframes moves none of its boundaries by more than `tolerance`."""
+    for start, end in ranges:
+        start_index = bisect.bisect_right(keyframes, start) - 1
+        end_index = bisect.bisect_left(keyframes, end)
+        if start_index < 0 or start - keyframes[start_index] > tolerance:
+            return False
+        if end_index < len(keyframes) and keyframes[end_index] - end > tolerance:
+            return False
+    return True
+
+def _group_by_duration(items: List[Tuple[float, Any]], max_ratio: float) -> List[List[Any]]:
+    """Sorts (duration, item) pairs by duration and groups them so that within a group longest/shortest <= max_ratio."""
+    groups: List[List[Any]] = []
+    group_min = 0.0
+    for duration, item in sorted(items, key=lambda pair: pair[0]):
+        if groups and duration <= group_min * max_ratio:
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+            group_min = duration
+    return groups
+
+def _merge_speech_regions(speech: List[Dict[str, int]], max_samples: int) -> List[Tuple[int, int]]:
+    """Merges consecutive VAD speech regions (in samples) into clips no longer than max_samples."""
+    clips: List[Tuple[int, int]] = []
+    for region in speech:
+        if clips and region["end"] - clips[-1][0] <= max_samples:
+            clips[-1] = (clips[-1][0], region["end"])
+        else:
+            clips.append((region["start"], region["end"]))
+    return clips
+
+def _layout_group_clips(speech_per_video: List[List[Tuple[int, int]]], lengths: List[int]) -> Tuple[List[Dict[str, float]], List[float]]:
+    """
+    Places several videos' audio one after another, _GROUP_GAP_SAMPLES of silence apart, and returns the
+    clip_timestamps (in seconds) of all their speech clips together with the offset at which each video starts.
+    Every clip lies inside one video, so BatchedInferencePipeline, which decodes each given clip in its own
+    window, never mixes two videos in one segment.
+    """
+    clip_timestamps: List[Dict[str, float]] = []
+    offsets: List[float] = []
+    position = 0
+    for clips, length in zip(speech_per_video, lengths):
+        offsets.append(position / WHISPER_SAMPLE_RATE)
+        for start, end in clips:
+            clip_timestamps.append({"start": (start + position) / WHISPER_SAMPLE_RATE, "end": (end + position) / WHISPER_SAMPLE_RATE})
+        position += length + _GROUP_GAP_SAMPLES
+    return clip_timestamps, offsets
+
+def _split_group_segments(segments: List[Dict[str, Any]], offsets: List[float]) -> List[List[Dict[str, Any]]]:
+    """
+    Hands the segments of a _layout_group_clips transcription back to their videos, with times relative to each video.
+    A segment belongs to the video it starts in; the cut between two videos is the middle of the silence between
+    them, so a start rounded to the millisecond, or a little off the clip edge, still lands on the right side.
+    """
+    gap = _GROUP_GAP_SAMPLES / WHISPER_SAMPLE_RATE
+    cuts = [offset - gap / 2 for offset in offsets[1:]]
+    per_video: List[List[Dict[str, Any]]] = [[] for _ in offsets]
+    for segment in segments:
+        index = bisect.bisect_right(cuts, segment["start"])
+        offset = offsets[index]
+        per_video[index].append({"start": max(0.0, segment["start"] - offset), "end": max(0.0, segment["end"] - offset), "text": segment["text"]})
+    return per_video
+
+def _build_concat_filter(ranges: List[Tuple[float, float]]) -> str:
+    """Builds a filter graph that trims every (start, end) range and concatenates them into [v] and [a]."""
+    parts = []
+    for i, (start, end) in enumerate(ranges):
+        parts.append(f"[0:v]trim=start={start}:end={end},setpts=PTS-STARTPTS[v{i}]")
+        parts.append(f"[0:a]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[a{i}]")
+    pads = "".join(f"[v{i}][a{i}]" for i in range(len(ranges)))
+    parts.append(f"{pads}concat=n={len(ranges)}:v=1:a=1[v][a]")
+    return ";".join(parts)
+
+def _parse_json_moments(text: str) -> Optional[List[List[Any]]]:
+    """
+    Returns the "interesting_moments" lists of every JSON object in an LLM response (one per analyzed chunk),
+    or None if the response holds no such object, e.g. because it was written in the markdown format.
+    """
+    blocks = []
+    position = text.find("{")
+    while position != -1:
+        try:
+            obj, end = _JSON_DECODER.raw_decode(text, position)
+        except ValueError:
+            position = text.find("{", position + 1)
+            continue
+        if isinstance(obj, dict) and isinstance(obj.get("interesting_moments"), list):
+            blocks.append(obj["interesting_moments"])
+        position = text.find("{", end)
+    return blocks or None
+
+def _tokenize_moment_blocks(text: str) -> List[List[List[str]]]:
+    """
+    Walks an LLM response once, line by line, and returns its fenced Interesting_Moments blocks:
+    each block is a list of entries and each entry the stripped lines of one numbered moment.
+    """
+    blocks: List[List[List[str]]] = []
+    entries: List[List[str]] = []
+    state = "outside"  # "heading" once the block title is seen, "inside" after its opening fence
+    for line in text.splitlines():
+        stripped = line.strip()
+        if state == "inside":
+            if stripped.startswith("```"):
+                state = "outside"
+                continue
+            number, dot, rest = stripped.partition(".")
+            if dot and number.isdigit() and (not rest or rest[0].isspace()):
+                entries.append([])
+                stripped = rest.strip()
+            elif stripped.startswith("Title:") and any(field.startswith("Title:") for field in entries[-1]):
+                # A second title means the model left out the number between two moments.
+                entries.append([])
+            if stripped:
+                entries[-1].append(stripped)
+        elif "Interesting_Moments:" in stripped.replace("\\_", "_"):
+            state = "heading"
+            if stripped.endswith("```"):
+                entries = [[]]
+                blocks.append(entries)
+                state = "inside"
+        elif state == "heading":
+            if stripped.startswith("```"):
+                entries = [[]]
+                blocks.append(entries)
+                state = "inside"
+            elif stripped:
+                state = "outside"
+    return blocks
+
+def _leading_timestamp(value: str) -> Optional[str]:
+    """Returns the hh:mm:ss timestamp that `value` starts with, or None."""
+    stamp = value[:8]
+    if len(stamp) == 8 and stamp[2] == stamp[5] == ":" and (stamp[:2] + stamp[3:5] + stamp[6:]).isdigit():
+        return stamp
+    return None
+
+def _parse_moment_entry(lines: List[str]) -> Optional[Dict[str, str]]:
+    """
+    Reads the fields of one tokenized moment. Each field name is searched for in the whole entry and its value
+    runs up to the next field, so fields may share a line ("Start_Time: ... - End_Time: ...") or span several.
+    """
+    entry = "\n".join(lines)
+    positions = {name: entry.find(name) for name in _MOMENT_FIELDS}
+    if min(positions.values()) < 0:
+        return None
+    ordered = sorted(positions, key=positions.get)
+    fields = {}
+    for name, next_name in zip(ordered, ordered[1:] + [None]):
+        value = entry[positions[name] + len(name):positions[next_name] if next_name else len(entry)]
+        fields[name] = " ".join(value.split())
+    start_time = _leading_timestamp(fields["Start_Time:"])
+    end_time = _leading_timestamp(fields["End_Time:"])
+    if not start_time or not end_time:
+        return None
+    return {
+        "title": fields["Title:"],
+        "start_time": start_time,
+        "end_time": end_time,
+        "why": fields["Why_Interesting:"],
+    }
+
+def _iter_queue(items: "queue.SimpleQueue") -> Iterator[Any]:
+    """Yields items put on a queue by another thread until it puts None; an exception put there is raised."""
+    while (item := items.get()) is not None:
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+def _is_whisper_ready_wav(path: Path) -> bool:
+    """Returns True if `path` is an uncompressed 16 kHz mono 16-bit WAV file, i.e. exactly what Whisper is fed."""
+    if path.suffix.lower() != ".wav":
+        return False
+    try:
+        # Only the header is read; the wave module rejects anything but plain PCM.
+        with wave.open(str(path), "rb") as wav_file:
+            return wav_file.getnchannels() == 1 and wav_file.getsampwidth() == 2 and wav_file.getframerate() == WHISPER_SAMPLE_RATE
+    except (OSError, wave.Error, EOFError):
+        return False
+
+def _store_transcript(cache_key: str, segments: List[Dict[str, Any]]):
+    """Adds a transcription to the transcript cache and drops the least recently used ones beyond the cap."""
+    _transcript_cache.set(cache_key, [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in segments])
+    _transcript_cache.trim(TRANSCRIPT_CACHE_MAX_ENTRIES)
+
+def _ranges_overlap(a: Tuple[float, float], b: Tuple[float, float], min_ratio: float) -> bool:
+    """True if two (start, end) ranges are equal or overlap by more than `min_ratio` of the shorter one."""
+    if a == b:
+        return True
+    shorter = min(a[1] - a[0], b[1] - b[0])
+    overlap = min(a[1], b[1]) - max(a[0], b[0])
+    return shorter > 0 and overlap / shorter > min_ratio
+
+def _merge_chunk_highlights(highlights: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Merges per-chunk results: drops moments repeated in the chunk overlaps and restores time order.
+    Two chunks rarely report a shared moment with identical boundaries, so repeats are found by how
+    much their time ranges overlap (HIGHLIGHT_MERGE_OVERLAP_RATIO); the first one reported is kept.
+    """
+    # Sorted by time; the report order breaks ties and decides which of two repeats is kept.
+    ranged = sorted(
+        ((parse_timestamp(h["start_time"]), parse_timestamp(h["end_time"])), i, h) for i, h in enumerate(highlights)
+    )
+    kept: List[Tuple[Tuple[float, float], int, Dict[str, str]]] = []
+    for time_range, index, highlight in ranged:
+        if kept and _ranges_overlap(kept[-1][0], time_range, HIGHLIGHT_MERGE_OVERLAP_RATIO):
+            if index < kept[-1][1]:
+                kept[-1] = (time_range, index, highlight)
+            continue
+        kept.append((time_range, index, highlight))
+    return [highlight for _, _, highlight in kept]
 
 class VideoProcessor:
     """Handles the video processing workflow in distinct stages."""
-    def __init__(self, video_path: Path, output_dir: Path, whisper_model: str, llm_model: str, progress_callback: Optional[Callable] = None):
+    def __init__(self, video_path: Path, output_dir: Path, whisper_model: str, llm_model: str, progress_callback: Optional[Callable] = None,
+                 batch_size: Optional[int] = None, accurate: bool = False):
         self.video_path = video_path
         self.output_dir = output_dir
         video_stem = self.video_path.stem
         self.transcript_path = self.output_dir / f"{video_stem}{TRANSCRIPT_FILENAME_SUFFIX}"
         self.srt_path = self.output_dir / f"{video_stem}{SRT_FILENAME_SUFFIX}"
+        self.segments_path = self.output_dir / f"{video_stem}{SEGMENTS_FILENAME_SUFFIX}"
         self.highlights_path = self.output_dir / f"{video_stem}{HIGHLIGHTS_FILENAME_SUFFIX}"
         self.temp_audio_path = self.output_dir / f"{video_stem}{TEMP_AUDIO_FILENAME_SUFFIX}"
+        # The WAV file whisper.cpp reads: the extracted temp file, or the input itself when it needs no conversion.
+        self.whisper_input_path = self.temp_audio_path
         self.highlight_video_path = self.output_dir / f"{video_stem}{HIGHLIGHT_VIDEO_FILENAME_SUFFIX}"
         self.whisper_model = whisper_model
         self.llm_model = llm_model
-        self.llm_client = OpenRouterClient(OPENROUTER_API_KEY) if OPENROUTER_API_KEY else None
+        self.llm_client = get_shared_client(OPENROUTER_API_KEY) if OPENROUTER_API_KEY else None
         self.progress_callback = progress_callback
+        # Speech chunks decoded together by faster-whisper; None picks WHISPER_BATCH_SIZE_CUDA/_CPU for the device.
+        self.batch_size = batch_size
+        # Beam search (WHISPER_ACCURATE_DECODE_OPTIONS) instead of the default greedy decoding.
+        self.accurate = accurate
+        # Decoded 16 kHz mono samples, held only between extraction and transcription.
+        self.audio: Optional[np.ndarray] = None
+        # Segments transcribed ahead of time by process_many, which lets generate_highlights_data skip that step.
+        self._pretranscribed_segments: Optional[List[Dict[str, Any]]] = None
+
+    @classmethod
+    def process_many(cls, video_paths: List[Path], output_dir: Path, whisper_model: str, llm_model: str,
+                     batch_size: Optional[int] = None, accurate: bool = False) -> List[Tuple[Optional[List[Dict[str, str]]], Optional[List[Dict[str, Any]]]]]:
+        """
+        Runs generate_highlights_data for several videos, sharing one warm Whisper model.
+        With the faster-whisper backend, videos of similar length are transcribed together so
+        the speech chunks of several videos fill each GPU batch.
+        Returns one (highlights, segments) tuple per input video, in input order.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        processors = [cls(path, output_dir, whisper_model, llm_model, batch_size=batch_size, accurate=accurate) for path in video_paths]
+        if _resolve_whisper_backend() != "faster":
+            return [processor.generate_highlights_data() for processor in processors]
+        pending = [p for p in processors if not p.segments_path.is_file() and not p.transcript_path.is_file()]
+        durations = [(_probe_duration(p.video_path), p) for p in pending]
+        groups = _group_by_duration(durations, BATCH_GROUP_MAX_DURATION_RATIO)
+        # One worker per GPU keeps every replica of the model busy; the longest groups start first
+        # so the devices finish at about the same time. With one GPU (or none) this runs in order.
+        with ThreadPoolExecutor(max_workers=max(1, ctranslate2.get_cuda_device_count())) as executor:
+            list(executor.map(cls._transcribe_group, reversed(groups)))
+            return list(executor.map(lambda processor: processor.generate_highlights_data(), processors))
+
+    @staticmethod
+    def _transcribe_group(group: List["VideoProcessor"]):
+        """Transcribes a group of videos in one batched pass and hands each its own segments."""
+        if len(group) < 2:
+            # Nothing to share a batch with; generate_highlights_data transcribes it the usual way.
+            return
+        group = [p for p in group if p._extract_audio()]
+        cache_keys = {}
+        for processor in group:
+            cache_keys[processor] = key = processor._transcript_cache_key()
+            cached = _transcript_cache.get(key)
+            if cached is not None:
+                logging.info(f"Transcript cache hit for '{processor.video_path.name}'. Skipping transcription.")
+                processor._pretranscribed_segments = cached
+                processor.audio = None
+        group = [p for p in group if p._pretranscribed_segments is None]
+        if len(group) < 2:
+            # What is left is transcribed the usual way, reusing the audio extracted above.
+            return
+        logging.info(f"Transcribing {len(group)} videos of similar length together...")
+        # VAD runs per video and speech is merged into clips per video, so no clip holds audio of two videos;
+        # the options and 30s chunk limit mirror what BatchedInferencePipeline is given for a single video.
+        vad_options = VadOptions(max_speech_duration_s=WHISPER_CHUNK_SECONDS, **WHISPER_VAD_PARAMETERS)
+        speech_per_video = [
+            _merge_speech_regions(get_speech_timestamps(processor.audio, vad_options), WHISPER_CHUNK_SECONDS * WHISPER_SAMPLE_RATE)
+            for processor in group
+        ]
+        clip_timestamps, offsets = _layout_group_clips(speech_per_video, [len(processor.audio) for processor in group])
+        silence = np.zeros(_GROUP_GAP_SAMPLES, dtype=group[0].audio.dtype)
+        audio = np.concatenate([part for i, processor in enumerate(group) for part in ((silence, processor.audio) if i else (processor.audio,))])
+        for processor in group:
+            processor.audio = None
+        if not clip_timestamps:
+            logging.warning("No speech was detected in any of the grouped videos.")
+            for processor in group:
+                processor._pretranscribed_segments = []
+            return
+
+        segments = group[0]._transcribe_with_faster_whisper(audio, clip_timestamps)
+        if segments is None:
+            return
+        per_video = _split_group_segments(segments, offsets)
+        for processor, video_segments in zip(group, per_video):
+            processor._pretranscribed_segments = video_segments
+            _store_transcript(cache_keys[processor], video_segments)
 
     def generate_highlights_data(self) -> Tuple[Optional[List[Dict[str, str]]], Optional[List[Dict[str, Any]]]]:
         """
@@ -43,8 +504,21 @@ class VideoProcessor:
 
         full_transcript_text = None
         segments: Optional[List[Dict[str, Any]]] = None
+        highlights_future: Optional[Future] = None
+
+        saved_segments = self._load_segments() if self.segments_path.is_file() else None
 
-        if self.transcript_path.is_file():
+        if saved_segments is not None:
+            logging.info(f"Segments file found at '{self.segments_path}'. Skipping transcription.")
+            segments = saved_segments
+            if self.progress_callback:
+                self.progress_callback(1 / total_steps, "Skipping audio extraction...")
+                self.progress_callback(2 / total_steps, "Skipping transcription...")
+            if not self.transcript_path.is_file():
+                export_transcript_files(segments, self.transcript_path, self.srt_path)
+            full_transcript_text = format_transcript_compact(segments, LLM_TRANSCRIPT_BUCKET_SECONDS)
+            if self.progress_callback: self.progress_callback(3 / total_steps, "Transcripts loaded.")
+        elif self.transcript_path.is_file():
             logging.info(f"Transcript file found at '{self.transcript_path}'. Skipping transcription.")
             if self.progress_callback:
                 self.progress_callback(1 / total_steps, "Skipping audio extraction...")
@@ -53,17 +527,35 @@ class VideoProcessor:
             full_transcript_text = self.transcript_path.read_text(encoding="utf-8")
             # Note: 'segments' will be None here, so SRT export will be disabled in the GUI.
         else:
-            if not self._extract_audio():
-                return None, None
-            if self.progress_callback: self.progress_callback(1 / total_steps, "Audio extracted.")
-            
-            segments = self._transcribe_audio()
+            if self._pretranscribed_segments is not None:
+                segments = self._pretranscribed_segments
+            else:
+                if self.audio is None and not self._extract_audio():
+                    return None, None
+                if self.progress_callback: self.progress_callback(1 / total_steps, "Audio extracted.")
+
+                if self.llm_client and not self.highlights_path.is_file():
+                    # Segments are handed to the LLM request as they are decoded, so on long videos the first
+                    # transcript chunks are analyzed while Whisper is still working on the rest.
+                    decoded: "queue.SimpleQueue" = queue.SimpleQueue()
+                    highlights_future = self.llm_client.get_highlights_from_lines_async(
+                        iter_transcript_compact(_iter_queue(decoded), LLM_TRANSCRIPT_BUCKET_SECONDS), self.llm_model)
+                    try:
+                        segments = self._transcribe_audio(on_segment=decoded.put)
+                    finally:
+                        decoded.put(None if segments else RuntimeError("Transcription failed; highlights were not requested."))
+                else:
+                    segments = self._transcribe_audio()
             if self.progress_callback: self.progress_callback(2 / total_steps, "Audio transcribed.")
             
             if segments:
+                # The LLM gets the compact transcript; the saved .txt keeps one line per segment.
+                full_transcript_text = format_transcript_compact(segments, LLM_TRANSCRIPT_BUCKET_SECONDS)
+                if highlights_future is None and self.llm_client and not self.highlights_path.is_file():
+                    # The request is network-bound, so it is sent now and runs while the transcripts are written.
+                    highlights_future = self.llm_client.get_highlights_async(full_transcript_text, self.llm_model)
                 self._save_transcripts(segments)
                 if self.progress_callback: self.progress_callback(3 / total_steps, "Transcripts saved.")
-                full_transcript_text = self._format_transcript_for_llm(segments)
             else:
                 return None, None 
         
@@ -74,7 +566,7 @@ class VideoProcessor:
                 if self.progress_callback: self.progress_callback(4 / total_steps, "Parsing existing highlights...")
                 highlights_text = self.highlights_path.read_text(encoding="utf-8")
             elif self.llm_client:
-                highlights_text = self._generate_and_save_highlights(full_transcript_text, self.llm_model)
+                highlights_text = self._generate_and_save_highlights(full_transcript_text, self.llm_model, highlights_future)
                 if self.progress_callback: self.progress_callback(4 / total_steps, "Highlights generated by LLM.")
             else:
                 logging.warning("OPENROUTER_API_KEY not set. Skipping highlight generation.")
@@ -95,69 +587,293 @@ class VideoProcessor:
             logging.warning("No time segments provided to create_highlight_video. Aborting.")
             return
 
+        ranges = [(parse_timestamp(start), parse_timestamp(end)) for start, end in time_segments]
+        # Bounded to the clips' neighbourhoods, so probing stays cheap next to the cut even on long sources.
+        keyframes = _probe_keyframes(self.video_path, ranges) if HIGHLIGHT_CUT_MODE != "reencode" else []
+        if HIGHLIGHT_CUT_MODE == "auto":
+            use_copy = bool(keyframes) and _cuts_near_keyframes(ranges, keyframes, KEYFRAME_SNAP_TOLERANCE_SECONDS)
+        else:
+            use_copy = HIGHLIGHT_CUT_MODE == "copy"
+        if not use_copy:
+            # A single pass opens and demuxes the source once, and cuts exactly where asked.
+            self._create_highlight_video_single_pass(time_segments)
+        else:
+            self._create_highlight_video_stream_copy(time_segments, keyframes)
+
+        self._cleanup()
+
+    def _create_highlight_video_stream_copy(self, time_segments: List[Tuple[str, str]], keyframes: List[float]):
+        """Cuts each segment without re-encoding, then joins the clips with the concat demuxer."""
+        if keyframes:
+            # Stream copy can only start a clip on a keyframe; choosing the cut points here keeps every clip
+            # starting on a clean GOP for the concat demuxer instead of leaving it to ffmpeg's seek.
+            snapped = (_snap_to_keyframes(parse_timestamp(start), parse_timestamp(end), keyframes) for start, end in time_segments)
+            time_segments = [(str(start), str(end)) for start, end in snapped]
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
-            clip_files = []
-            for i, (start, end) in enumerate(time_segments):
-                clip_filename = temp_path / f"clip_{i}.mp4"
-                command = ["ffmpeg", "-y", "-i", str(self.video_path), "-ss", start, "-to", end, "-c", "copy", str(clip_filename)]
-                try:
-                    subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    clip_files.append(clip_filename)
-                except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                    logging.error(f"Failed to create clip {i} with ffmpeg.")
-                    if isinstance(e, subprocess.CalledProcessError): logging.error(f"FFmpeg stderr: {e.stderr.decode()}")
-                    return
-            
-            if not clip_files:
-                logging.error("No clips were successfully created, cannot generate highlight video.")
-                return
-
-            concat_list_path = temp_path / "concat_list.txt"
-            with open(concat_list_path, "w", encoding="utf-8") as f:
-                for clip in clip_files: f.write(f"file '{clip.resolve()}'\n")
+            clip_paths = [temp_path / f"clip_{i}.mp4" for i in range(len(time_segments))]
+            # Each clip is an independent, I/O-bound ffmpeg process, so they are cut concurrently;
+            # the cap keeps a long selection from saturating the disk with dozens of readers.
+            with ThreadPoolExecutor(max_workers=min(CLIP_MAX_WORKERS, os.cpu_count() or 1)) as executor:
+                futures = [executor.submit(self._extract_clip, i, segment, path) for i, (segment, path) in enumerate(zip(time_segments, clip_paths))]
+                for future in as_completed(futures):
+                    if not future.result():
+                        # The video cannot be built without every clip, so clips that have not started are dropped.
+                        for pending in futures:
+                            pending.cancel()
+                        logging.error("Not every clip could be created, cannot generate highlight video.")
+                        return
 
-            concat_command = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_list_path), "-c", "copy", str(self.highlight_video_path)]
+            # The concat list is piped in on stdin rather than written to a file. Entries are resolved against
+            # the list's own URL, so they carry an explicit file: prefix, and that protocol must be whitelisted.
+            concat_list = "".join(f"file 'file:{clip.resolve()}'\n" for clip in clip_paths)
+            concat_command = ["ffmpeg", *FFMPEG_LOG_ARGS, "-y", "-f", "concat", "-safe", "0", "-protocol_whitelist", "file,pipe",
+                              "-i", "pipe:0", "-c", "copy", str(self.highlight_video_path)]
             try:
-                subprocess.run(concat_command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                run_quiet(concat_command, input=concat_list.encode("utf-8"))
                 logging.info(f"✅ Successfully created highlight video: {self.highlight_video_path}")
             except (subprocess.CalledProcessError, FileNotFoundError) as e:
                 logging.error(f"Failed to stitch clips with ffmpeg.")
                 if isinstance(e, subprocess.CalledProcessError): logging.error(f"FFmpeg stderr: {e.stderr.decode()}")
-        
-        self._cleanup()
+
+    def _extract_clip(self, index: int, time_range: Tuple[str, str], clip_path: Path) -> bool:
+        """Cuts one segment out of the source video without re-encoding it."""
+        start, end = time_range
+        # Seeking on the input jumps straight to the keyframe before `start` through the container
+        # index, instead of demuxing and discarding everything that precedes the clip.
+        command = ["ffmpeg", *FFMPEG_LOG_ARGS, "-nostdin", "-y", "-ss", start, "-to", end, "-i", str(self.video_path), "-c", "copy", str(clip_path)]
+        try:
+            run_quiet(command)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            logging.error(f"Failed to create clip {index} with ffmpeg.")
+            if isinstance(e, subprocess.CalledProcessError): logging.error(f"FFmpeg stderr: {e.stderr.decode()}")
+            return False
+
+    def _create_highlight_video_single_pass(self, time_segments: List[Tuple[str, str]]):
+        """Trims and joins all segments in one ffmpeg run; frame-accurate, but re-encodes the output."""
+        ranges = [(parse_timestamp(start), parse_timestamp(end)) for start, end in time_segments]
+        # trim only discards frames after they are decoded, so the input is limited to the span that holds
+        # every segment: ffmpeg seeks to the first start and stops reading after the last end, and the
+        # trim points are shifted to the new zero.
+        window_start = min(start for start, _ in ranges)
+        window_end = max(end for _, end in ranges)
+        filter_complex = _build_concat_filter([(start - window_start, end - window_start) for start, end in ranges])
+        # Decoding on the GPU/media engine frees the CPU for the encoder; frames are copied back for the filters.
+        # A hardware encoder, when there is one, takes the encode off the CPU as well.
+        hwaccel = get_ffmpeg_hwaccel()
+        command = [
+            "ffmpeg", *FFMPEG_LOG_ARGS, "-y", *(["-hwaccel", hwaccel] if hwaccel else []),
+            "-ss", str(window_start), "-t", str(window_end - window_start), "-i", str(self.video_path),
+            "-filter_complex", filter_complex, "-map", "[v]", "-map", "[a]", *get_ffmpeg_video_encoder_args(), "-threads", "0",
+            str(self.highlight_video_path)
+        ]
+        total_duration = sum(end - start for start, end in ranges)
+        try:
+            if self.progress_callback:
+                run_ffmpeg_with_progress(command, total_duration, lambda fraction: self.progress_callback(fraction, f"Encoding highlight video... {fraction:.0%}"))
+            else:
+                run_quiet(command)
+            logging.info(f"✅ Successfully created highlight video: {self.highlight_video_path}")
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            logging.error("Failed to create the highlight video with ffmpeg.")
+            if isinstance(e, subprocess.CalledProcessError): logging.error(f"FFmpeg stderr: {e.stderr.decode()}")
 
     def _extract_audio(self) -> bool:
+        if _is_whisper_ready_wav(self.video_path):
+            return self._load_whisper_ready_wav()
         logging.info(f"Extracting audio from '{self.video_path.name}'...")
-        command = ["ffmpeg", "-y", "-i", str(self.video_path), "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1", str(self.temp_audio_path)]
+        if _resolve_whisper_backend() == "cpp":
+            # whisper.cpp reads its input from a file.
+            return self._extract_audio_to_wav()
+        # The Python backends accept samples directly, so ffmpeg's raw PCM is piped into memory
+        # instead of being written to a WAV file and read back.
+        command = ["ffmpeg", *FFMPEG_LOG_ARGS, "-nostdin", "-i", str(self.video_path), "-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(WHISPER_SAMPLE_RATE), "-ac", "1", "-"]
+        try:
+            result = run_quiet(command, stdout=subprocess.PIPE)
+            self.audio = np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+            logging.info(f"Audio extracted successfully ({len(self.audio) / WHISPER_SAMPLE_RATE:.0f}s).")
+            return True
+        except (FileNotFoundError, subprocess.CalledProcessError) as e:
+            logging.error(f"Error during audio extraction. Make sure FFmpeg is installed and in your PATH. Details: {e}")
+            return False
+
+    def _load_whisper_ready_wav(self) -> bool:
+        """Uses an input that is already 16 kHz mono 16-bit PCM as is, without running ffmpeg over it."""
+        logging.info(f"'{self.video_path.name}' is already 16 kHz mono PCM; skipping audio extraction.")
+        if _resolve_whisper_backend() == "cpp":
+            self.whisper_input_path = self.video_path
+            return True
+        try:
+            with wave.open(str(self.video_path), "rb") as wav_file:
+                frames = wav_file.readframes(wav_file.getnframes())
+        except (OSError, wave.Error, EOFError) as e:
+            logging.error(f"Could not read '{self.video_path.name}': {e}")
+            return False
+        self.audio = np.frombuffer(frames, np.int16).astype(np.float32) / 32768.0
+        return True
+
+    def _extract_audio_to_wav(self) -> bool:
+        command = ["ffmpeg", *FFMPEG_LOG_ARGS, "-y", "-i", str(self.video_path), "-vn", "-acodec", "pcm_s16le", "-ar", str(WHISPER_SAMPLE_RATE), "-ac", "1", str(self.temp_audio_path)]
         try:
-            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            run_quiet(command)
             logging.info(f"Audio extracted successfully to '{self.temp_audio_path}'.")
             return True
         except (FileNotFoundError, subprocess.CalledProcessError) as e:
             logging.error(f"Error during audio extraction. Make sure FFmpeg is installed and in your PATH. Details: {e}")
             return False
 
-    def _format_transcript_for_llm(self, segments: List[Dict[str, Any]]) -> str:
-        """Formats the transcript segments into a single string for the LLM."""
-        return "".join(
-            f"[{format_timestamp(s['start'])}] {s['text'].strip()}\n" for s in segments
-        )
+    def _transcribe_audio(self, on_segment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Transcribes the extracted audio with the configured WHISPER_BACKEND.
+        `on_segment` is called with each segment as soon as it is available: while decoding with
+        faster-whisper, and once the whole file is done with the other backends.
+        """
+        cache_key = self._transcript_cache_key()
+        segments = _transcript_cache.get(cache_key)
+        if segments is None:
+            segments = self._run_transcription(on_segment)
+            if segments:
+                _store_transcript(cache_key, segments)
+            return segments
+        logging.info("Transcript cache hit for this audio. Skipping transcription.")
+        self.audio = None
+        if on_segment:
+            for segment in segments:
+                on_segment(segment)
+        return segments
+
+    def _run_transcription(self, on_segment: Optional[Callable[[Dict[str, Any]], None]]) -> Optional[List[Dict[str, Any]]]:
+        """Runs the configured WHISPER_BACKEND over the extracted audio; see _transcribe_audio."""
+        backend = _resolve_whisper_backend()
+        if backend == "faster":
+            try:
+                return self._transcribe_with_faster_whisper(self.audio, on_segment=on_segment)
+            finally:
+                # The samples are no longer needed once transcribed; do not keep them alive with the processor.
+                self.audio = None
+        if backend == "cpp":
+            segments = self._transcribe_with_whisper_cpp()
+        else:
+            try:
+                segments = self._transcribe_with_openai_whisper()
+            finally:
+                self.audio = None
+        if segments and on_segment:
+            for segment in segments:
+                on_segment(segment)
+        return segments
+
+    def _transcript_cache_key(self) -> str:
+        """Hashes the audio Whisper will see together with every setting that changes its output."""
+        if self.audio is not None:
+            digest = hashlib.blake2b(self.audio, digest_size=16)
+        else:
+            digest = hashlib.blake2b(digest_size=16)
+            # Read in 1 MiB chunks; hashlib.file_digest would do the same but needs Python 3.11.
+            with open(self.whisper_input_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        settings = {
+            "backend": _resolve_whisper_backend(), "model": self.whisper_model, "accurate": self.accurate,
+            "decode": WHISPER_DECODE_OPTIONS, "faster_decode": WHISPER_FASTER_DECODE_OPTIONS, "vad": WHISPER_VAD_PARAMETERS,
+        }
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
 
-    def _transcribe_audio(self) -> Optional[List[Dict[str, Any]]]:
-        logging.info(f"Loading Whisper model '{self.whisper_model}'...")
+    def _transcribe_with_faster_whisper(self, audio: np.ndarray, clip_timestamps: Optional[List[Dict[str, float]]] = None,
+                                        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[List[Dict[str, Any]]]:
+        device, compute_type = _select_whisper_device()
+        logging.info(f"Loading Whisper model '{self.whisper_model}' on {device} ({compute_type})...")
         try:
-            model = whisper.load_model(self.whisper_model)
+            model = _get_whisper_model(self.whisper_model, device, compute_type)
+            # VAD splits the audio into speech chunks that are decoded in batches rather than one 30s window at a time.
+            # Callers that already know the speech chunks pass them as clip_timestamps (in seconds) instead.
+            pipeline = BatchedInferencePipeline(model=model)
+            batch_size = self.batch_size or (WHISPER_BATCH_SIZE_CUDA if device == "cuda" else WHISPER_BATCH_SIZE_CPU)
+            # English-only models skip the language detection pass.
+            language = "en" if self.whisper_model.endswith(".en") else None
+            decode_options = WHISPER_ACCURATE_DECODE_OPTIONS if self.accurate else {**WHISPER_DECODE_OPTIONS, **WHISPER_FASTER_DECODE_OPTIONS}
+            logging.info(f"Model loaded. Starting batched transcription (batch size {batch_size})...")
+            # Batched mode defaults to without_timestamps=True, which returns one segment per speech chunk of up to
+            # 30s; timestamp tokens keep the per-sentence segments that the .srt cues and transcript lines need.
+            segments, _info = pipeline.transcribe(
+                audio, batch_size=batch_size, language=language, without_timestamps=False, **decode_options,
+                # faster-whisper pops keys from a vad_parameters dict, so it gets its own copy.
+                vad_filter=clip_timestamps is None, vad_parameters=dict(WHISPER_VAD_PARAMETERS), clip_timestamps=clip_timestamps,
+            )
+            # Decoding happens lazily while the generator is consumed; keep the dict shape used downstream.
+            result = []
+            for s in segments:
+                segment = {"start": s.start, "end": s.end, "text": s.text}
+                result.append(segment)
+                if on_segment:
+                    on_segment(segment)
+            logging.info("Transcription complete.")
+            return result
+        except Exception as e:
+            logging.error(f"Error during transcription: {e}")
+            return None
+
+    def _transcribe_with_openai_whisper(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            device = _select_torch_device()
+            logging.info(f"Loading openai-whisper model '{self.whisper_model}' on {device}...")
+            model = _get_openai_whisper_model(self.whisper_model, device)
             logging.info("Model loaded. Starting transcription...")
-            result = model.transcribe(str(self.temp_audio_path), fp16=False)
+            audio = self.audio
+            if device == "cuda":
+                import torch
+                # whisper computes the log-mel spectrogram on the device of its input (and caches the mel
+                # filters there), so handing it a CUDA tensor moves the STFT off the CPU as well.
+                audio = torch.from_numpy(audio).to(device)
+            # fp16 halves the memory traffic per tensor on the GPU; on the CPU it is unsupported and would only warn.
+            decode_options = WHISPER_ACCURATE_DECODE_OPTIONS if self.accurate else WHISPER_DECODE_OPTIONS
+            result = model.transcribe(audio, fp16=device == "cuda", **decode_options)
             logging.info("Transcription complete.")
             return result.get("segments")
         except Exception as e:
             logging.error(f"Error during transcription: {e}")
             return None
 
-    def _generate_and_save_highlights(self, full_transcript: str, llm_model: str) -> Optional[str]:
-        highlights = self.llm_client.get_highlights_from_transcript(full_transcript, llm_model)
+    def _transcribe_with_whisper_cpp(self) -> Optional[List[Dict[str, Any]]]:
+        model_path = Path(WHISPER_CPP_MODEL_PATH.format(model=self.whisper_model))
+        logging.info(f"Transcribing with whisper.cpp using '{model_path}'...")
+        output_base = self.temp_audio_path.with_suffix("")
+        json_path = output_base.with_suffix(".json")
+        if self.accurate:
+            decode_args = ["-bs", str(WHISPER_ACCURATE_DECODE_OPTIONS["beam_size"]), "-bo", str(WHISPER_ACCURATE_DECODE_OPTIONS["best_of"])]
+        else:
+            # The same greedy settings as WHISPER_DECODE_OPTIONS: no beam search, no temperature fallback, no text context.
+            decode_args = ["-bs", "1", "-bo", "1", "-nf", "-mc", "0"]
+        command = [
+            WHISPER_CPP_BINARY, "-m", str(model_path), "-f", str(self.whisper_input_path),
+            *decode_args, "-oj", "-of", str(output_base)
+        ]
+        try:
+            run_quiet(command)
+            transcription = json.loads(json_path.read_text(encoding="utf-8"))["transcription"]
+            # whisper.cpp reports offsets in milliseconds; keep the dict shape used downstream.
+            result = [
+                {"start": s["offsets"]["from"] / 1000, "end": s["offsets"]["to"] / 1000, "text": s["text"]}
+                for s in transcription
+            ]
+            logging.info("Transcription complete.")
+            return result
+        except subprocess.CalledProcessError as e:
+            logging.error(f"whisper.cpp failed: {e.stderr.decode(errors='replace')}")
+        except (OSError, KeyError, ValueError) as e:
+            logging.error(f"Error during transcription: {e}")
+        finally:
+            json_path.unlink(missing_ok=True)
+        return None
+
+    def _generate_and_save_highlights(self, full_transcript: str, llm_model: str, pending: Optional[Future] = None) -> Optional[str]:
+        """Saves the LLM's highlights, waiting on an already-sent request when one is given."""
+        if pending is not None:
+            highlights = pending.result()
+        else:
+            highlights = self.llm_client.get_highlights_from_transcript(full_transcript, llm_model)
         if highlights:
             with open(self.highlights_path, "w", encoding="utf-8") as f: f.write(highlights)
             logging.info(f"Highlights saved to {self.highlights_path}")
@@ -167,35 +883,40 @@ class VideoProcessor:
 
     def _parse_highlights_to_structured_data(self, highlights_text: str) -> List[Dict[str, str]]:
         logging.info("Parsing structured highlights from text...")
+        json_blocks = _parse_json_moments(highlights_text)
+        if json_blocks is not None:
+            highlights = [
+                {
+                    "title": str(moment["title"]).strip(),
+                    "start_time": moment["start_time"],
+                    "end_time": moment["end_time"],
+                    "why": str(moment["why_interesting"]).strip().replace('\n', ' '),
+                }
+                for moments in json_blocks for moment in moments
+                if isinstance(moment, dict) and all(key in moment for key in ("title", "start_time", "end_time", "why_interesting"))
+                and _leading_timestamp(str(moment["start_time"])) == moment["start_time"]
+                and _leading_timestamp(str(moment["end_time"])) == moment["end_time"]
+            ]
+            return _merge_chunk_highlights(highlights) if len(json_blocks) > 1 else highlights
+
         highlights = []
         try:
-            moments_block_match = re.search(r"Interesting_Moments:\s*```(.*?)```", highlights_text, re.DOTALL)
-            if not moments_block_match:
+            # Long transcripts are analyzed in chunks, so the text may hold several blocks.
+            moments_blocks = _tokenize_moment_blocks(highlights_text)
+            if not moments_blocks:
                 logging.warning("Could not find 'Interesting_Moments' block in highlights text.")
                 return []
 
-            moments_text = moments_block_match.group(1).strip()
-            moment_entries = re.split(r'\n?\d+\.\s*', moments_text)
-            
-            for entry in moment_entries:
-                entry = entry.strip()
-                if not entry:
-                    continue
-
-                title_match = re.search(r"Title:\s*(.*)", entry)
-                start_time_match = re.search(r"Start_Time:\s*(\d{2}:\d{2}:\d{2})", entry)
-                end_time_match = re.search(r"End_Time:\s*(\d{2}:\d{2}:\d{2})", entry)
-                why_match = re.search(r"Why_Interesting:\s*(.*)", entry, re.DOTALL)
-
-                if all([title_match, start_time_match, end_time_match, why_match]):
-                    highlights.append({
-                        "title": title_match.group(1).strip(),
-                        "start_time": start_time_match.group(1).strip(),
-                        "end_time": end_time_match.group(1).strip(),
-                        "why": why_match.group(1).strip().replace('\n', ' ')
-                    })
+            for entry in (entry for block in moments_blocks for entry in block if entry):
+                highlight = _parse_moment_entry(entry)
+                if highlight:
+                    highlights.append(highlight)
                 else:
-                    logging.warning(f"Could not fully parse a highlight entry: '{entry}'")
+                    entry_text = "\n".join(entry)
+                    logging.warning(f"Could not fully parse a highlight entry: '{entry_text}'")
+
+            if len(moments_blocks) > 1:
+                highlights = _merge_chunk_highlights(highlights)
 
         except Exception as e:
             logging.error(f"An unexpected error occurred while parsing highlights: {e}")
@@ -205,12 +926,25 @@ class VideoProcessor:
         return highlights
 
     def _save_transcripts(self, segments: List[Dict[str, Any]]):
-        with open(self.transcript_path, "w", encoding="utf-8") as f:
-            f.write(self._format_transcript_for_llm(segments))
-        logging.info(f"Transcript saved to {self.transcript_path}")
-        
-        # Save SRT using the new utility function
-        export_transcript_to_srt(segments, self.srt_path)
+        """Writes the segments sidecar, then the .txt and .srt transcripts in one pass over the segments."""
+        self._save_segments(segments)
+        export_transcript_files(segments, self.transcript_path, self.srt_path)
+
+    def _save_segments(self, segments: List[Dict[str, Any]]):
+        """Keeps the raw segments next to the transcripts so later runs (e.g. with a new prompt) skip Whisper."""
+        try:
+            self.segments_path.write_bytes(
+                _json_dumps([{"start": s["start"], "end": s["end"], "text": s["text"]} for s in segments])
+            )
+        except OSError as e:
+            logging.error(f"Could not save transcript segments: {e}")
+
+    def _load_segments(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return _json_loads(self.segments_path.read_bytes())
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable segments file '{self.segments_path.name}': {e}")
+            return None
 
     def _cleanup(self):
         try:
@@ -1,9 +1,12 @@
 # In youtube_downloader.py
 
 import logging
+import shutil
 import subprocess
 from pathlib import Path
 
+from .config import YTDLP_CONCURRENT_FRAGMENTS
+
 def download_youtube_video(url: str, output_dir: Path) -> Path | None:
     """
     Downloads a YouTube video using the yt-dlp command-line tool.
@@ -26,27 +29,32 @@ def download_youtube_video(url: str, output_dir: Path) -> Path | None:
             # Get the best mp4 video and audio and merge them
             "-f", "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
             "--merge-output-format", "mp4",
+            # Fetch several fragments at once instead of one stream that YouTube throttles per connection
+            "--concurrent-fragments", str(YTDLP_CONCURRENT_FRAGMENTS),
+            *(["--downloader", "aria2c", "--downloader-args", "aria2c:-x 16 -s 16 -k 1M"] if shutil.which("aria2c") else []),
             # Define the output file path and name
             "-o", str(output_dir / "%(title)s.%(ext)s"),
+            # Print the final path (after merging) instead of guessing it from the directory contents
+            "--print", "after_move:filepath", "--no-simulate",
             url,
         ]
 
-        # Run the command and capture output
+        # stdout now only carries the printed path; stderr holds warnings and errors for the handler below.
         result = subprocess.run(
             command,
             check=True,
+            capture_output=True,
+            text=True,
         )
 
-        # Find the downloaded file, as yt-dlp names it based on the video title
-        files_in_output_dir = list(output_dir.glob("*.mp4"))
-        if not files_in_output_dir:
-            logging.error("yt-dlp ran but no MP4 file was found in the output directory.")
+        printed_paths = result.stdout.strip().splitlines()
+        if not printed_paths:
+            logging.error("yt-dlp ran but did not report the downloaded file.")
             return None
 
-        # Return the most recently modified file in the directory
-        latest_file = max(files_in_output_dir, key=lambda p: p.stat().st_mtime)
-        logging.info(f"yt-dlp download successful. File saved as: {latest_file.name}")
-        return latest_file
+        downloaded_file = Path(printed_paths[-1])
+        logging.info(f"yt-dlp download successful. File saved as: {downloaded_file.name}")
+        return downloaded_file
 
     except FileNotFoundError:
         logging.error("yt-dlp command not found. Please ensure it is installed and in your system's PATH.")
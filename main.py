@@ -1,18 +1,72 @@
 import customtkinter as ctk
 from customtkinter import filedialog
+import enum
 import logging
 import queue
 import threading
+import tkinter
 from pathlib import Path
 from logging.handlers import QueueHandler
-from typing import Optional, List, Dict, Tuple, Any
+from typing import Callable, Optional, List, Dict, Tuple, Any
 
-from audio_highlighter.video_processor import VideoProcessor
+from audio_highlighter.video_processor import VideoProcessor, preload_whisper_model
 from audio_highlighter.config import OPENROUTER_API_KEY, AVAILABLE_WHISPER_MODELS, DEFAULT_WHISPER_MODEL, DEFAULT_LLM_MODEL
 from audio_highlighter.youtube_downloader import download_youtube_video
 from audio_highlighter.utils import is_ffmpeg_installed
 from audio_highlighter.highlight_editor_gui import HighlightEditorWindow
-from audio_highlighter.api_client import OpenRouterClient
+from audio_highlighter.api_client import get_shared_client
+
+LOG_BATCH_SIZE = 200  # log records written to the textbox per insert
+LOG_SAFETY_POLL_MS = 250  # log queue polling interval on a non-threaded Tcl
+# Records waiting for the textbox beyond this are dropped (and counted) unless they are warnings or errors,
+# so a logging storm from a worker cannot outrun the UI and grow the queue without bound.
+LOG_QUEUE_MAX_RECORDS = 5000
+
+class AppState(enum.Enum):
+    """What the main window is busy with; new tasks only start from IDLE. Values read as "while ..." phrases."""
+    IDLE = "idle"
+    DOWNLOADING = "downloading a video"
+    ANALYZING = "analyzing a video"
+    REVIEWING = "reviewing highlights"
+    CREATING = "creating the highlight video"
+
+class _NotifyingQueueHandler(QueueHandler):
+    """A QueueHandler that also tells the GUI a record is waiting, so the queue needs no fast polling."""
+    def __init__(self, log_queue: queue.SimpleQueue, notify: Callable[[], None], max_records: int = LOG_QUEUE_MAX_RECORDS):
+        super().__init__(log_queue)
+        self.notify = notify
+        self.max_records = max_records
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        # Checked before prepare() so a dropped record is never formatted.
+        if record.levelno < logging.WARNING and self.queue.qsize() >= self.max_records:
+            with self._dropped_lock:
+                self._dropped += 1
+            return
+        super().emit(record)
+
+    def take_dropped_count(self) -> int:
+        """Returns how many records were dropped since the last call."""
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        return dropped
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # prepare() replaces msg with the fully formatted line; the bare message is kept for the status label.
+        message = record.getMessage()
+        prepared = super().prepare(record)
+        prepared.status_message = message
+        return prepared
+
+    def handle(self, record: logging.LogRecord):
+        rv = super().handle(record)
+        # Notified only after Handler.handle has released the handler lock: posting the Tk event can block
+        # until the Tk thread handles it, and the Tk thread may itself be waiting to log through this handler.
+        if rv:
+            self.notify()
+        return rv
 
 class App(ctk.CTk):
     def __init__(self):
@@ -27,6 +81,9 @@ class App(ctk.CTk):
         self.creation_thread: Optional[threading.Thread] = None
         self.download_thread: Optional[threading.Thread] = None
         self.editor_window: Optional[HighlightEditorWindow] = None
+        # Only changed on the Tk thread (button commands and the workers' self.after callbacks), so the
+        # check-then-start in the start_* methods cannot race and needs no lock.
+        self.app_state = AppState.IDLE
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(3, weight=1) 
@@ -79,15 +136,30 @@ class App(ctk.CTk):
         self.progress_bar = ctk.CTkProgressBar(self.status_frame)
         self.progress_bar.set(0)
         
-        self.log_queue = queue.Queue()
-        self.queue_handler = QueueHandler(self.log_queue)
+        self.log_queue = queue.SimpleQueue()
+        self.log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        self.queue_handler = _NotifyingQueueHandler(self.log_queue, self._notify_log_record)
+        # QueueHandler.prepare formats each record with this on the thread that logged it, so the Tk
+        # thread only concatenates finished lines.
+        self.queue_handler.setFormatter(self.log_formatter)
+        # Set while a <<LogRecord>> event is pending, so a burst of records posts it once; shared by all threads.
+        self._log_pump_scheduled = False
+        self._log_pump_lock = threading.Lock()
+        # A threaded Tcl runs calls made from other threads on the Tk thread, so workers can post <<LogRecord>>
+        # themselves; a non-threaded one cannot take calls from them, and the queue is polled instead.
+        self._tcl_threaded = self.tk.eval("info exists tcl_platform(threaded)") == "1" and self.tk.eval("set tcl_platform(threaded)") == "1"
         logging.basicConfig(level=logging.INFO, handlers=[self.queue_handler])
-        self.after(100, self.poll_log_queue)
-        self.check_dependencies()
-        
-        # Start a thread to fetch models on launch
-        self.fetch_models_thread = threading.Thread(target=self.fetch_and_update_llm_models, daemon=True)
-        self.fetch_models_thread.start()
+        self.bind("<<LogRecord>>", self.drain_log_queue)
+        if self._tcl_threaded:
+            # Every record wakes the pump itself; one drain once the main loop runs picks up any logged before it.
+            self.after(0, self.drain_log_queue)
+        else:
+            # Workers cannot post the event, so their records are polled for.
+            self.after(LOG_SAFETY_POLL_MS, self.poll_log_queue)
+        # Start a thread to fetch models on launch; without FFmpeg nothing can be analyzed, so it is skipped.
+        if self.check_dependencies():
+            self.fetch_models_thread = threading.Thread(target=self.fetch_and_update_llm_models, daemon=True)
+            self.fetch_models_thread.start()
 
     def fetch_and_update_llm_models(self):
         """Fetches the list of free LLM models and schedules a UI update."""
@@ -96,7 +168,7 @@ class App(ctk.CTk):
             logging.error("Cannot fetch models, OPENROUTER_API_KEY is not set.")
             return
 
-        client = OpenRouterClient(api_key=OPENROUTER_API_KEY)
+        client = get_shared_client(OPENROUTER_API_KEY)
         free_models = client.get_free_models()
         self.after(0, self.update_llm_model_menu, free_models)
 
@@ -113,6 +185,11 @@ class App(ctk.CTk):
             logging.warning("Could not fetch free models from OpenRouter. Using default.")
             self.status_label.configure(text="Warning: Could not fetch updated model list.", text_color="orange")
 
+    def _transition(self, new_state: AppState):
+        """Moves to `new_state`; the main controls are enabled exactly when the app is idle."""
+        self.app_state = new_state
+        self.set_ui_state(is_enabled=new_state is AppState.IDLE)
+
     def set_ui_state(self, is_enabled: bool):
         """Helper function to enable/disable main UI controls."""
         state = "normal" if is_enabled else "disabled"
@@ -124,7 +201,8 @@ class App(ctk.CTk):
         self.llm_model_menu.configure(state=state)
 
     # --- Other methods (check_dependencies, run_analysis, etc.) remain the same ---
-    def check_dependencies(self):
+    def check_dependencies(self) -> bool:
+        """Disables the UI and shows an error when FFmpeg is missing; returns whether everything was found."""
         if not is_ffmpeg_installed():
             self.set_ui_state(is_enabled=False)
             error_message = "FATAL: FFmpeg not found. Please install FFmpeg and ensure it is in your system's PATH."
@@ -133,20 +211,23 @@ class App(ctk.CTk):
             self.log_textbox.insert("1.0", error_message)
             self.log_textbox.configure(state="disabled")
             logging.error(error_message)
+            return False
+        return True
 
     def start_download_thread(self):
-        if (self.download_thread and self.download_thread.is_alive()) or \
-           (self.analysis_thread and self.analysis_thread.is_alive()):
-            logging.warning("A download or analysis process is already running.")
+        if self.app_state is not AppState.IDLE:
+            logging.warning(f"Cannot start a download while {self.app_state.value}.")
             return
         youtube_url = self.url_entry.get()
         if not youtube_url:
             logging.error("YouTube URL cannot be empty.")
             return
             
-        self.set_ui_state(is_enabled=False)
+        self._transition(AppState.DOWNLOADING)
         self.path_label.configure(text="Downloading...", text_color="gray")
         download_dir = Path("videos")
+        # The model is read from disk while the video downloads, so the analysis does not wait for both in turn.
+        threading.Thread(target=preload_whisper_model, args=(self.whisper_model_menu.get(),), daemon=True).start()
         self.download_thread = threading.Thread(
             target=self.run_youtube_downloader,
             args=(youtube_url, download_dir),
@@ -166,7 +247,7 @@ class App(ctk.CTk):
         else:
             self.path_label.configure(text="Download failed. Check logs.", text_color="red")
             logging.error("Failed to set video path after download.")
-        self.set_ui_state(is_enabled=True)
+        self._transition(AppState.IDLE)
 
     def select_video_file(self):
         path_str = filedialog.askopenfilename(
@@ -183,33 +264,34 @@ class App(ctk.CTk):
             self.status_label.configure(text=f"Ready to process '{self.video_path.name}'")
 
     def start_analysis_thread(self):
-        if self.analysis_thread and self.analysis_thread.is_alive():
-            logging.warning("Analysis is already in progress.")
+        if self.app_state is not AppState.IDLE:
+            logging.warning(f"Cannot start an analysis while {self.app_state.value}.")
             return
             
-        self.set_ui_state(is_enabled=False)
+        self._transition(AppState.ANALYZING)
         self.progress_bar.grid(row=1, column=0, sticky="ew", pady=(5,0))
         self.progress_bar.set(0)
         
+        # The worker gets its inputs as arguments: Tk widgets are only read on this thread, and the
+        # selection cannot change under it while the worker runs (with or without a GIL).
         self.analysis_thread = threading.Thread(
             target=self.run_analysis,
+            args=(self.video_path, self.whisper_model_menu.get(), self.llm_model_menu.get()),
             daemon=True
         )
         self.analysis_thread.start()
 
-    def run_analysis(self):
-        if not self.video_path:
+    def run_analysis(self, video_path: Optional[Path], whisper_model: str, llm_model: str):
+        if not video_path:
             logging.error("No video file selected for analysis.")
             self.after(0, self.on_analysis_finished, None, None)
             return
             
         try:
             output_dir = Path("output")
-            whisper_model = self.whisper_model_menu.get()
-            llm_model = self.llm_model_menu.get()
             
             self.processor = VideoProcessor(
-                video_path=self.video_path,
+                video_path=video_path,
                 output_dir=output_dir,
                 whisper_model=whisper_model,
                 llm_model=llm_model,
@@ -228,21 +310,30 @@ class App(ctk.CTk):
         if highlights_data and self.processor:
             self.status_label.configure(text="Analysis complete. Please review highlights.")
             logging.info("Analysis finished. Opening highlight editor window.")
+            self.app_state = AppState.REVIEWING
             self.editor_window = HighlightEditorWindow(
                 master=self,
                 highlights=highlights_data,
                 transcript_segments=transcript_segments,
                 start_creation_callback=self.start_creation_thread
             )
+            self.editor_window.bind("<Destroy>", self.on_editor_closed, add="+")
         else:
             logging.error("Analysis did not produce any highlights. Check logs for details.")
             self.status_label.configure(text="Analysis failed. Ready for next video.")
-            self.set_ui_state(is_enabled=True)
+            self._transition(AppState.IDLE)
+
+    def on_editor_closed(self, event):
+        """Returns to idle when the editor is closed without starting a video (its children's events are ignored)."""
+        if event.widget is self.editor_window and self.app_state is AppState.REVIEWING:
+            self.status_label.configure(text="Ready for next video.")
+            self._transition(AppState.IDLE)
 
     def start_creation_thread(self, time_segments: List[Tuple[str, str]]):
-        if self.creation_thread and self.creation_thread.is_alive():
-            logging.warning("A video creation process is already running.")
+        if self.app_state is not AppState.REVIEWING:
+            logging.warning(f"Cannot create a highlight video while {self.app_state.value}.")
             return
+        self.app_state = AppState.CREATING
             
         self.progress_bar.grid(row=1, column=0, sticky="ew", pady=(5,0))
         self.progress_bar.set(0)
@@ -270,27 +361,65 @@ class App(ctk.CTk):
         """Callback run on the main thread after the final video is created."""
         self.progress_bar.grid_remove()
         self.status_label.configure(text="Processing finished! Ready for next video.")
-        self.set_ui_state(is_enabled=True)
+        self._transition(AppState.IDLE)
 
     def update_progress(self, value: float, text: str):
+        # VideoProcessor calls this from the worker thread, in the middle of transcription or encoding;
+        # the widgets are updated on the Tk thread, like the workers' other callbacks.
+        self.after(0, self._apply_progress, value, text)
+
+    def _apply_progress(self, value: float, text: str):
         self.progress_bar.set(value)
         self.status_label.configure(text=text)
 
-    def poll_log_queue(self):
-        while True:
+    def _notify_log_record(self):
+        """Called from any thread when a record is queued; schedules one drain on the Tk thread per burst."""
+        if not self._tcl_threaded and threading.current_thread() is not threading.main_thread():
+            return  # poll_log_queue picks the record up
+        with self._log_pump_lock:
+            if self._log_pump_scheduled:
+                return
+            self._log_pump_scheduled = True
+        try:
+            self.event_generate("<<LogRecord>>", when="tail")
+        except (RuntimeError, tkinter.TclError):
+            # RuntimeError: the main loop is not running yet, and the first drain picks the record up.
+            # TclError: the window has been destroyed while a worker was still logging; there is nothing to show it in.
+            with self._log_pump_lock:
+                self._log_pump_scheduled = False
+
+    def drain_log_queue(self, event=None):
+        """Moves up to LOG_BATCH_SIZE queued log records into the textbox with a single insert."""
+        # Cleared before the queue is read, so a record queued from here on posts a new event.
+        with self._log_pump_lock:
+            self._log_pump_scheduled = False
+        batch = []
+        while len(batch) < LOG_BATCH_SIZE:
             try:
-                record = self.log_queue.get(block=False)
+                batch.append(self.log_queue.get(block=False))
             except queue.Empty:
                 break
-            else:
-                msg = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s').format(record)
-                self.log_textbox.configure(state="normal")
-                self.log_textbox.insert("end", msg + "\n")
-                self.log_textbox.see("end")
-                self.log_textbox.configure(state="disabled")
-                if record.levelno >= logging.WARNING:
-                    self.status_label.configure(text=record.getMessage())
-        self.after(100, self.poll_log_queue)
+        if not batch:
+            return
+        text = "".join(record.getMessage() + "\n" for record in batch)
+        dropped = self.queue_handler.take_dropped_count()
+        if dropped:
+            text += f"[{dropped} log messages skipped]\n"
+        self.log_textbox.configure(state="normal")
+        self.log_textbox.insert("end", text)
+        self.log_textbox.see("end")
+        self.log_textbox.configure(state="disabled")
+        warnings = [record for record in batch if record.levelno >= logging.WARNING]
+        if warnings:
+            self.status_label.configure(text=warnings[-1].status_message)
+        if len(batch) == LOG_BATCH_SIZE:
+            # A flood of records is written in slices so the window keeps handling input in between.
+            self.after_idle(self.drain_log_queue)
+
+    def poll_log_queue(self):
+        """Drains the log queue every LOG_SAFETY_POLL_MS; only used on a non-threaded Tcl."""
+        self.drain_log_queue()
+        self.after(LOG_SAFETY_POLL_MS, self.poll_log_queue)
 
 if __name__ == "__main__":
     if not OPENROUTER_API_KEY:
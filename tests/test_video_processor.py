@@ -0,0 +1,91 @@
+import unittest
+
+try:
+    from audio_highlighter.video_processor import (
+        VideoProcessor, WHISPER_SAMPLE_RATE, _cuts_near_keyframes, _layout_group_clips, _merge_chunk_highlights,
+        _split_group_segments,
+    )
+except ImportError as e:  # faster-whisper / ctranslate2 not installed
+    raise unittest.SkipTest(f"video_processor dependencies missing: {e}")
+
+
+def _moments_block(body: str) -> str:
+    return f"#### Interesting_Moments:\n\n```\n{body}\n```\n"
+
+
+class ParseHighlightsTest(unittest.TestCase):
+    def setUp(self):
+        self.processor = VideoProcessor.__new__(VideoProcessor)
+
+    def parse(self, text):
+        return self.processor._parse_highlights_to_structured_data(text)
+
+    def test_fields_on_separate_lines(self):
+        text = _moments_block(
+            "1.\nTitle: The reveal\nStart_Time: 00:01:05\nEnd_Time: 00:01:30\nWhy_Interesting: Big moment\nthat spans lines."
+        )
+        self.assertEqual(self.parse(text), [
+            {"title": "The reveal", "start_time": "00:01:05", "end_time": "00:01:30", "why": "Big moment that spans lines."},
+        ])
+
+    def test_start_and_end_time_on_one_line(self):
+        text = _moments_block(
+            "1. Title: Same line\nStart_Time: 00:01:02 - End_Time: 00:01:30\nWhy_Interesting: Both times on one line."
+        )
+        self.assertEqual(self.parse(text), [
+            {"title": "Same line", "start_time": "00:01:02", "end_time": "00:01:30", "why": "Both times on one line."},
+        ])
+
+
+class MergeChunkHighlightsTest(unittest.TestCase):
+    @staticmethod
+    def moment(title, start, end):
+        return {"title": title, "start_time": start, "end_time": end, "why": ""}
+
+    def test_same_moment_with_slightly_different_boundaries(self):
+        first_chunk = [self.moment("Intro", "00:00:10", "00:00:30"), self.moment("Reveal", "00:09:58", "00:10:40")]
+        second_chunk = [self.moment("The reveal", "00:10:01", "00:10:42"), self.moment("Outro", "00:15:00", "00:15:20")]
+        merged = _merge_chunk_highlights(first_chunk + second_chunk)
+        self.assertEqual([h["title"] for h in merged], ["Intro", "Reveal", "Outro"])
+
+    def test_adjacent_moments_are_kept(self):
+        highlights = [self.moment("B", "00:01:00", "00:02:00"), self.moment("A", "00:00:00", "00:01:05")]
+        self.assertEqual([h["title"] for h in _merge_chunk_highlights(highlights)], ["A", "B"])
+
+
+class GroupTranscriptionLayoutTest(unittest.TestCase):
+    def test_speech_at_a_video_boundary_stays_with_its_video(self):
+        sr = WHISPER_SAMPLE_RATE
+        # Video A's last words end exactly where it ends, and video B's first words start at its very beginning.
+        speech_per_video = [[(int(9.5 * sr), 10 * sr)], [(0, sr // 2)]]
+        clips, offsets = _layout_group_clips(speech_per_video, [10 * sr, 10 * sr])
+        self.assertEqual(len(clips), 2)
+        self.assertLessEqual(clips[0]["end"], offsets[1])
+        self.assertGreaterEqual(clips[1]["start"], offsets[1])
+        self.assertGreater(clips[1]["start"], clips[0]["end"])
+
+        # One segment per clip, as batched decoding returns them; B's start is rounded just below its offset.
+        segments = [
+            {"start": clips[0]["start"], "end": clips[0]["end"], "text": "end of A"},
+            {"start": round(clips[1]["start"] - 0.0004, 3), "end": clips[1]["end"], "text": "start of B"},
+        ]
+        video_a, video_b = _split_group_segments(segments, offsets)
+        self.assertEqual([s["text"] for s in video_a], ["end of A"])
+        self.assertEqual([s["text"] for s in video_b], ["start of B"])
+        self.assertAlmostEqual(video_a[0]["start"], 9.5)
+        self.assertEqual(video_b[0]["start"], 0.0)
+
+
+class CutsNearKeyframesTest(unittest.TestCase):
+    keyframes = [0.0, 2.0, 4.0, 6.0, 8.0]
+
+    def test_cuts_on_keyframes(self):
+        self.assertTrue(_cuts_near_keyframes([(2.1, 5.8), (6.0, 9.5)], self.keyframes, 0.5))
+
+    def test_cut_between_keyframes(self):
+        self.assertFalse(_cuts_near_keyframes([(2.1, 5.8), (3.0, 4.0)], self.keyframes, 0.5))
+        self.assertFalse(_cuts_near_keyframes([(2.0, 4.9)], self.keyframes, 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()